@@ -0,0 +1,100 @@
+# accounts.py
+"""Batch analysis for many accounts, fanned out over a process pool.
+
+    python accounts.py --accounts 5000 --output account_results
+    python accounts.py --source-dir exports/ --output account_results --workers 8
+"""
+import argparse
+import json
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+from aggregates import compute_aggregates
+
+def synthetic_account(account_id, num_records=150):
+    """Sample transactions for an account, reproducible from its id"""
+    from data import generate_transactions
+    return generate_transactions(num_records, seed=zlib.crc32(account_id.encode()))
+
+def exported_account(account_id, source_dir):
+    """Transactions from <source_dir>/<account_id>.csv or .parquet"""
+    from importer import load_transactions
+    for extension in ('.csv', '.parquet'):
+        path = os.path.join(source_dir, account_id + extension)
+        if os.path.exists(path):
+            return load_transactions(path)
+    raise FileNotFoundError(f"No export found for account {account_id} in {source_dir}")
+
+def exported_account_ids(source_dir):
+    """Account ids of every CSV or Parquet export in a directory"""
+    return sorted(
+        os.path.splitext(name)[0]
+        for name in os.listdir(source_dir)
+        if name.endswith(('.csv', '.parquet'))
+    )
+
+def analyze_account(account_id, df):
+    """Run the dashboard analysis for one account's transactions"""
+    from data import analyze_spending, generate_ai_summary, generate_monthly_statement
+
+    if df.empty:
+        return {'account_id': account_id, 'stats': None, 'ai_summary': None, 'statement_summary': None}
+
+    aggregates = compute_aggregates(df)
+    stats = analyze_spending(df, aggregates)
+    statement_summary, _ = generate_monthly_statement(df, aggregates)
+    return {
+        'account_id': account_id,
+        'stats': stats,
+        'ai_summary': generate_ai_summary(stats, df, aggregates),
+        'statement_summary': statement_summary
+    }
+
+def process_accounts(account_ids, loader, output_dir):
+    """Work unit: analyze a chunk of accounts and write one JSON file per account"""
+    for account_id in account_ids:
+        result = analyze_account(account_id, loader(account_id))
+        path = os.path.join(output_dir, f"{account_id}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, default=float)
+    return len(account_ids)
+
+def run_accounts(account_ids, loader, output_dir, workers=None, chunk_size=50):
+    """Analyze every account across a process pool; returns the number processed"""
+    os.makedirs(output_dir, exist_ok=True)
+    chunks = [account_ids[i:i + chunk_size] for i in range(0, len(account_ids), chunk_size)]
+
+    processed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(process_accounts, chunk, loader, output_dir) for chunk in chunks]
+        for future in as_completed(futures):
+            processed += future.result()
+    return processed
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze many accounts in parallel")
+    parser.add_argument('--output', default='account_results', help="Directory for per-account JSON results")
+    parser.add_argument('--source-dir', help="Directory of <account_id>.csv/.parquet exports")
+    parser.add_argument('--accounts', type=int, default=1000, help="Number of sample accounts when no source dir is given")
+    parser.add_argument('--rows', type=int, default=150, help="Transactions per sample account")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per core)")
+    parser.add_argument('--chunk-size', type=int, default=50, help="Accounts per work unit")
+    args = parser.parse_args()
+
+    if args.source_dir:
+        account_ids = exported_account_ids(args.source_dir)
+        loader = partial(exported_account, source_dir=args.source_dir)
+    else:
+        account_ids = [f"acct-{i:06d}" for i in range(args.accounts)]
+        loader = partial(synthetic_account, num_records=args.rows)
+
+    start = time.perf_counter()
+    processed = run_accounts(account_ids, loader, args.output, args.workers, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f"Analyzed {processed} accounts in {elapsed:.2f}s ({processed / elapsed:.1f} accounts/s) -> {args.output}")
+
+if __name__ == '__main__':
+    main()
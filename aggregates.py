@@ -0,0 +1,115 @@
+# aggregates.py
+import numpy as np
+import pandas as pd
+
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+class SpendingAggregates:
+    """Per-category, per-month, per-weekday and per-day rollups of one set of transactions"""
+
+    def __init__(self, total_spent, transaction_count, largest_transaction,
+                 category_totals, category_counts, month_totals, month_counts,
+                 month_category_totals, month_active_days, weekday_totals,
+                 weekday_counts, daily_totals):
+        self.total_spent = total_spent
+        self.transaction_count = transaction_count
+        self.largest_transaction = largest_transaction
+        self.category_totals = category_totals
+        self.category_counts = category_counts
+        self.month_totals = month_totals
+        self.month_counts = month_counts
+        self.month_category_totals = month_category_totals
+        self.month_active_days = month_active_days
+        self.weekday_totals = weekday_totals
+        self.weekday_counts = weekday_counts
+        self.daily_totals = daily_totals
+
+    @property
+    def weekday_means(self):
+        """Average transaction amount per weekday, NaN for weekdays with no spending"""
+        return self.weekday_totals / self.weekday_counts.replace(0, np.nan)
+
+    @property
+    def favorite_category(self):
+        """Most frequent category, ties broken alphabetically"""
+        counts = self.category_counts
+        if counts.empty:
+            return 'N/A'
+        return min(counts.index[counts == counts.max()])
+
+def month_key(year, month):
+    """Key used for month rollups, e.g. '2024-03'"""
+    return f"{year:04d}-{month:02d}"
+
+def compute_aggregates(df):
+    """Compute every rollup the dashboard needs with one scan of the transactions"""
+    amounts = df['amount'].to_numpy(dtype=np.float64)
+    days = df['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+
+    if isinstance(df['category'].dtype, pd.CategoricalDtype):
+        category_codes = df['category'].cat.codes.to_numpy()
+        category_names = df['category'].cat.categories.astype(str)
+    else:
+        category_codes, category_names = pd.factorize(df['category'], sort=True)
+        category_names = pd.Index(category_names).astype(str)
+
+    # Integer keys for every grouping, derived once from the date column
+    months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    weekdays = (days + 3) % 7  # 1970-01-01 was a Thursday
+    first_day = days.min() if len(days) else 0
+    first_month = months.min() if len(months) else 0
+    day_offsets = days - first_day
+    month_offsets = months - first_month
+
+    n_categories = len(category_names)
+    n_months = int(month_offsets.max()) + 1 if len(months) else 0
+    n_days = int(day_offsets.max()) + 1 if len(days) else 0
+
+    category_totals = np.bincount(category_codes, weights=amounts, minlength=n_categories)
+    category_counts = np.bincount(category_codes, minlength=n_categories)
+    month_totals = np.bincount(month_offsets, weights=amounts, minlength=n_months)
+    month_counts = np.bincount(month_offsets, minlength=n_months)
+    weekday_totals = np.bincount(weekdays, weights=amounts, minlength=7)
+    weekday_counts = np.bincount(weekdays, minlength=7)
+    day_totals = np.bincount(day_offsets, weights=amounts, minlength=n_days)
+    day_counts = np.bincount(day_offsets, minlength=n_days)
+    month_category = np.bincount(
+        month_offsets * n_categories + category_codes,
+        weights=amounts,
+        minlength=n_months * n_categories
+    ).reshape(n_months, n_categories)
+
+    # Only keep groups that actually have transactions
+    seen_categories = category_counts > 0
+    seen_months = month_counts > 0
+    seen_days = day_counts > 0
+
+    month_labels = (np.arange(n_months) + first_month).astype('datetime64[M]')
+    month_index = pd.Index(month_labels[seen_months].astype(str))
+    day_labels = (np.arange(n_days) + first_day).astype('datetime64[D]')
+    day_index = pd.DatetimeIndex(day_labels[seen_days].astype('datetime64[ns]'))
+    category_index = category_names[seen_categories]
+
+    day_months = day_labels.astype('datetime64[M]').astype(np.int64) - first_month
+    month_active_days = np.bincount(day_months[seen_days], minlength=n_months)
+
+    return SpendingAggregates(
+        total_spent=float(amounts.sum()),
+        transaction_count=len(amounts),
+        largest_transaction=float(amounts.max()) if len(amounts) else 0.0,
+        category_totals=pd.Series(
+            category_totals[seen_categories], index=category_index
+        ).sort_values(ascending=False, kind='stable'),
+        category_counts=pd.Series(category_counts[seen_categories], index=category_index),
+        month_totals=pd.Series(month_totals[seen_months], index=month_index),
+        month_counts=pd.Series(month_counts[seen_months], index=month_index),
+        month_category_totals=pd.DataFrame(
+            month_category[np.ix_(seen_months, seen_categories)],
+            index=month_index,
+            columns=category_index
+        ),
+        month_active_days=pd.Series(month_active_days[seen_months], index=month_index),
+        weekday_totals=pd.Series(weekday_totals, index=DAY_ORDER),
+        weekday_counts=pd.Series(weekday_counts, index=DAY_ORDER),
+        daily_totals=pd.Series(day_totals[seen_days], index=day_index)
+    )
@@ -0,0 +1,76 @@
+# async_api.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from flask import Blueprint, copy_current_request_context, current_app, jsonify, request
+
+from aggregates import compute_aggregates
+from data import (dashboard, date_index, derived_for, generate_monthly_statement, store,
+                  transactions_response)
+from http_cache import conditional
+from metrics import stage
+
+async_bp = Blueprint('async_api', __name__, url_prefix='/async')
+
+def init_app(app):
+    """Register the async JSON endpoints and their bounded worker pool"""
+    try:
+        import asgiref
+    except ImportError:
+        # Flask only runs async views with its async extra: pip install "flask[async]"
+        return
+    app.extensions['async_executor'] = ThreadPoolExecutor(
+        max_workers=app.config['ASYNC_WORKERS'],
+        thread_name_prefix='spending-async'
+    )
+    app.register_blueprint(async_bp)
+
+async def run_blocking(fn, *args):
+    """Run pandas or I/O work on the bounded pool, keeping the event loop free"""
+    executor = current_app.extensions['async_executor']
+    work = copy_current_request_context(partial(fn, *args))
+    return await asyncio.get_running_loop().run_in_executor(executor, work)
+
+@async_bp.route('/refresh')
+async def refresh_data():
+    """Async variant of /refresh"""
+    with stage('load'):
+        await run_blocking(store.refresh)
+    with stage('payload'):
+        payload = await run_blocking(dashboard.get, store.version)
+
+    return jsonify({
+        'stats': payload['stats'],
+        'ai_summary': payload['ai_summary'],
+        'recent_transactions': payload['recent_transactions']
+    })
+
+@async_bp.route('/generate_statement')
+@conditional(store)
+async def generate_statement():
+    """Async variant of /generate_statement"""
+    with stage('load'):
+        version, df = await run_blocking(store.snapshot)
+    with stage('aggregate'):
+        # Both are built from this snapshot if a refresh or append lands meanwhile
+        aggregates, index = await asyncio.gather(
+            run_blocking(derived_for, version, df, 'aggregates', compute_aggregates),
+            run_blocking(date_index, version, df)
+        )
+    with stage('statement'):
+        statement_summary, monthly_df = await run_blocking(generate_monthly_statement, df, aggregates, index)
+        monthly_transactions = await run_blocking(monthly_df.head(20).to_dict, 'records')
+
+    return jsonify({
+        'statement_summary': statement_summary,
+        'monthly_transactions': monthly_transactions
+    })
+
+@async_bp.route('/api/transactions')
+@conditional(store)
+async def get_transactions():
+    """Async variant of /api/transactions"""
+    with stage('load'):
+        version, df = await run_blocking(store.snapshot)
+    return await run_blocking(transactions_response, version, df, request.args)
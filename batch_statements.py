@@ -0,0 +1,207 @@
+# batch_statements.py
+"""Render PDF statements for many accounts and months on a process pool.
+
+    python batch_statements.py --accounts 500 --output statements
+    python batch_statements.py --source-dir exports/ --months 2024-05 2024-06 --zip statements.zip
+    python batch_statements.py --accounts 500 --output statements   # rerun to resume after an interruption
+
+Statements are written as <account>/statement_<YYYY-MM>.pdf. Each file is
+written under a temporary name and renamed when complete, so a rerun skips
+every statement that already exists. A zip archive is resumable the same way
+as long as the interrupted run closed it, which happens on Ctrl-C or any
+exception but not when the process is killed outright.
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import time
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+from aggregates import compute_aggregates
+from date_index import DateIndex
+
+def statement_name(account_id, month):
+    """Path of one statement inside the output directory or archive"""
+    return f"{account_id}/statement_{month}.pdf"
+
+def month_statements(df, months=None):
+    """Yield (month, statement_summary, monthly_df) for each requested month that has transactions"""
+    from data import generate_monthly_statement
+
+    if df.empty:
+        return
+    aggregates = compute_aggregates(df)
+    index = DateIndex.from_frame(df)
+    available = aggregates.month_totals.index
+    for month in months or available:
+        if month in available:
+            yield (month, *generate_monthly_statement(df, aggregates, index, month=month))
+
+def render_statement(statement_summary, monthly_df):
+    """One statement as PDF bytes, with its page count"""
+    from statements import render_statement_pdf
+
+    output = io.BytesIO()
+    pages = render_statement_pdf(statement_summary, monthly_df, output)
+    return output.getvalue(), pages
+
+def write_atomically(path, data):
+    """Write a file under a temporary name and rename it, so partial files never look complete"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial_path = path + '.part'
+    with open(partial_path, 'wb') as f:
+        f.write(data)
+    os.replace(partial_path, path)
+
+def render_accounts(account_ids, loader, months=None, output_dir=None, done=frozenset()):
+    """Work unit: render the statements of a chunk of accounts, skipping names in `done`.
+
+    With an output_dir each PDF is written there and returned without its
+    bytes; otherwise the bytes are returned for the caller to archive.
+    Returns a list of (name, pdf bytes or None, pages).
+    """
+    results = []
+    for account_id in account_ids:
+        pending = None if months is None else [m for m in months if statement_name(account_id, m) not in done]
+        if pending == []:
+            continue
+        for month, statement_summary, monthly_df in month_statements(loader(account_id), pending):
+            name = statement_name(account_id, month)
+            if name in done:
+                continue
+            data, pages = render_statement(statement_summary, monthly_df)
+            if output_dir:
+                write_atomically(os.path.join(output_dir, name), data)
+                data = None
+            results.append((name, data, pages))
+    return results
+
+def completed_statements(output_dir=None, archive=None):
+    """Names of statements finished by an earlier run"""
+    if archive is not None:
+        return set(archive.namelist())
+    done = set()
+    if output_dir and os.path.isdir(output_dir):
+        for root, _, files in os.walk(output_dir):
+            for name in files:
+                if name.endswith('.pdf'):
+                    done.add(os.path.relpath(os.path.join(root, name), output_dir).replace(os.sep, '/'))
+    return done
+
+def run_batch(account_ids, loader, months=None, output_dir=None, archive=None, workers=None, chunk_size=10):
+    """Render statements across a process pool into a directory or an open ZipFile; returns (statements, pages)"""
+    done = defaultdict(set)
+    for name in completed_statements(output_dir, archive):
+        done[name.split('/', 1)[0]].add(name)
+    chunks = [account_ids[i:i + chunk_size] for i in range(0, len(account_ids), chunk_size)]
+
+    statements = pages = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(render_accounts, chunk, loader, months, output_dir,
+                        frozenset(name for account_id in chunk for name in done.get(account_id, ())))
+            for chunk in chunks
+        ]
+        for future in as_completed(futures):
+            for name, data, page_count in future.result():
+                if archive is not None:
+                    archive.writestr(name, data)
+                statements += 1
+                pages += page_count
+    return statements, pages
+
+class ChunkWriter(io.RawIOBase):
+    """Unseekable sink collecting what a ZipFile writes, so it can be streamed out"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def take(self):
+        """Everything written since the last call"""
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def zip_stream(entries):
+    """Yield a zip archive of (name, bytes) entries piece by piece, as each entry is added"""
+    sink = ChunkWriter()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+            yield sink.take()
+    yield sink.take()
+
+def statement_pool(workers=None):
+    """Process pool for rendering statements from inside a threaded server.
+
+    Workers are started with forkserver (spawn where that is unavailable)
+    rather than forked from the server, so they never inherit a lock some
+    other server thread was holding. Processes start on first use.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+def frame_statements(df, pool, months=None):
+    """Yield (file name, PDF bytes) for each month of one frame, rendered on a shared pool in month order"""
+    futures = [
+        (month, pool.submit(render_statement, statement_summary, monthly_df))
+        for month, statement_summary, monthly_df in month_statements(df, months)
+    ]
+    try:
+        for month, future in futures:
+            data, _ = future.result()
+            yield f"statement_{month}.pdf", data
+    finally:
+        # A client that disconnects early should not leave its statements queued
+        for _, future in futures:
+            future.cancel()
+
+def main():
+    from accounts import exported_account, exported_account_ids, synthetic_account
+
+    parser = argparse.ArgumentParser(description="Render PDF statements for many accounts in parallel")
+    parser.add_argument('--output', default='statements', help="Directory for <account>/statement_<month>.pdf files")
+    parser.add_argument('--zip', help="Write statements into this zip archive instead of a directory")
+    parser.add_argument('--source-dir', help="Directory of <account_id>.csv/.parquet exports")
+    parser.add_argument('--accounts', type=int, default=100, help="Number of sample accounts when no source dir is given")
+    parser.add_argument('--rows', type=int, default=150, help="Transactions per sample account")
+    parser.add_argument('--months', nargs='+', help="Months to render (YYYY-MM); default: every month with transactions")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per core)")
+    parser.add_argument('--chunk-size', type=int, default=10, help="Accounts per work unit")
+    args = parser.parse_args()
+
+    if args.source_dir:
+        account_ids = exported_account_ids(args.source_dir)
+        loader = partial(exported_account, source_dir=args.source_dir)
+    else:
+        account_ids = [f"acct-{i:06d}" for i in range(args.accounts)]
+        loader = partial(synthetic_account, num_records=args.rows)
+
+    start = time.perf_counter()
+    if args.zip:
+        with zipfile.ZipFile(args.zip, 'a', compression=zipfile.ZIP_DEFLATED) as archive:
+            statements, pages = run_batch(account_ids, loader, args.months, archive=archive,
+                                          workers=args.workers, chunk_size=args.chunk_size)
+        target = args.zip
+    else:
+        statements, pages = run_batch(account_ids, loader, args.months, output_dir=args.output,
+                                      workers=args.workers, chunk_size=args.chunk_size)
+        target = args.output
+    elapsed = time.perf_counter() - start
+    print(f"Rendered {statements} statements ({pages} pages) in {elapsed:.2f}s "
+          f"({statements / elapsed:.1f} statements/s, {pages / elapsed:.1f} pages/s) -> {target}")
+
+if __name__ == '__main__':
+    main()
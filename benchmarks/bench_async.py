@@ -0,0 +1,83 @@
+# benchmarks/bench_async.py
+"""Compare the sync and async JSON endpoints under concurrent clients on one worker.
+
+Run from the project root:
+
+    python -m benchmarks.bench_async --clients 1 8 32 --io-latency 0.05
+
+The app is served by a single threaded werkzeug server. Each data load
+sleeps for --io-latency seconds to stand in for a database or file read.
+For every client count the script reports throughput and p95 latency, and
+the largest client count whose p95 stays within --slo seconds.
+"""
+import argparse
+import statistics
+import threading
+import time
+import urllib.request
+
+from werkzeug.serving import make_server
+
+import data
+from store import create_store
+
+def slow_loader(rows, io_latency):
+    """Loader that waits like a database read before returning sample data"""
+    def load():
+        time.sleep(io_latency)
+        return data.generate_transactions(rows, seed=0)
+    return load
+
+def run_clients(url, clients, duration):
+    """Hit url from concurrent client threads; return (requests per second, p95 latency)"""
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            with urllib.request.urlopen(url) as response:
+                response.read()
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+    return len(latencies) / duration, p95
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--io-latency', type=float, default=0.05)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--slo', type=float, default=0.5, help="p95 latency target in seconds")
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+
+    transaction_store = create_store('memory', loader=slow_loader(args.rows, args.io_latency))
+    app = data.create_app(transaction_store=transaction_store)
+    server = make_server('127.0.0.1', args.port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        for variant, path in (('sync', '/refresh'), ('async', '/async/refresh')):
+            url = f"http://127.0.0.1:{args.port}{path}"
+            served = 0
+            for clients in args.clients:
+                throughput, p95 = run_clients(url, clients, args.duration)
+                if p95 <= args.slo:
+                    served = clients
+                print(f"{variant:<6} {clients:>4} clients {throughput:>8.1f} req/s  p95 {p95 * 1000:>8.1f} ms", flush=True)
+            print(f"{variant}: up to {served} concurrent clients within p95 {args.slo * 1000:.0f} ms")
+    finally:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# benchmarks/bench_startup.py
+"""Measure worker cold start: importing data.py and creating the app in a fresh interpreter.
+
+Run from the project root:
+
+    python -m benchmarks.bench_startup --runs 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+STARTUP = """
+import json, resource, sys, time
+start = time.perf_counter()
+import data
+app = data.create_app()
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'seconds': elapsed,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'plotly_loaded': 'plotly' in sys.modules,
+    'reportlab_loaded': 'reportlab' in sys.modules
+}))
+"""
+
+def measure_startup():
+    """Start one fresh interpreter and return its startup measurements"""
+    output = subprocess.run([sys.executable, '-c', STARTUP], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    results = [measure_startup() for _ in range(args.runs)]
+    seconds = [result['seconds'] for result in results]
+    print(f"runs: {args.runs}")
+    print(f"startup median: {statistics.median(seconds) * 1000:.1f} ms (min {min(seconds) * 1000:.1f} ms)")
+    print(f"max RSS: {statistics.median(result['max_rss_mb'] for result in results):.1f} MB")
+    print(f"plotly loaded at startup: {results[-1]['plotly_loaded']}")
+    print(f"reportlab loaded at startup: {results[-1]['reportlab_loaded']}")
+
+if __name__ == '__main__':
+    main()
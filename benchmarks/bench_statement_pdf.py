@@ -0,0 +1,47 @@
+# benchmarks/bench_statement_pdf.py
+"""Measure PDF statement rendering throughput in pages per second.
+
+Run from the project root:
+
+    python -m benchmarks.bench_statement_pdf --rows 10000 50000
+"""
+import argparse
+import tempfile
+import time
+
+from data import generate_monthly_statement, generate_transactions
+from statements import render_statement_pdf
+
+def bench_statement_pdf(rows, seed=0):
+    """Render one statement for a month with the given number of rows"""
+    df = generate_transactions(max(rows, 150), seed=seed)
+    statement_summary, monthly_df = generate_monthly_statement(df)
+    monthly_df = monthly_df.sample(rows, replace=True, random_state=seed).sort_values('date', ascending=False)
+
+    with tempfile.TemporaryFile() as output:
+        start = time.perf_counter()
+        pages = render_statement_pdf(statement_summary, monthly_df, output)
+        elapsed = time.perf_counter() - start
+        size = output.tell()
+
+    return {
+        'rows': len(monthly_df),
+        'pages': pages,
+        'seconds': round(elapsed, 3),
+        'pages_per_second': round(pages / elapsed, 1),
+        'bytes': size
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'pages':>7} {'seconds':>9} {'pages/s':>9} {'MB':>7}")
+    for rows in args.rows:
+        result = bench_statement_pdf(rows)
+        print(f"{result['rows']:>8} {result['pages']:>7} {result['seconds']:>9} "
+              f"{result['pages_per_second']:>9} {result['bytes'] / 1e6:>7.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+# benchmarks/suite.py
+"""Benchmark the analysis functions, the PDF statement and every Flask route at several data sizes.
+
+Run from the project root:
+
+    python -m benchmarks.suite --sizes 150 10000 1000000 10000000
+    python -m benchmarks.suite --sizes 150 10000 --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --sizes 150 10000 --baseline benchmarks/baseline.json
+
+Each case records the best wall time over --repeat runs, plus the peak
+traced memory and the number of memory blocks still allocated afterwards
+(from one extra run under tracemalloc). Comparing against a baseline exits
+with status 1 when any case is slower or uses more peak memory than the
+baseline by more than --tolerance.
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import data
+from aggregates import compute_aggregates
+from cube import AggregateCube
+from date_index import DateIndex
+from insights import compute_insights
+from statements import render_statement_pdf
+from store import create_store
+
+DEFAULT_SIZES = [150, 10_000, 1_000_000, 10_000_000]
+
+ROUTES = ['/', '/refresh', '/generate_statement', '/download_statement', '/api/transactions', '/api/charts',
+          '/api/window', '/api/rolling', '/api/insights', '/api/trend', '/api/cube?group_by=merchant,month']
+
+def measure(fn, repeat=3):
+    """Best wall time over repeat runs, then peak memory and retained blocks from one traced run"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+
+    return {'seconds': round(best, 6), 'peak_bytes': peak, 'retained_blocks': retained}
+
+def render_pdf(monthly_df, statement_summary):
+    with tempfile.TemporaryFile() as output:
+        render_statement_pdf(statement_summary, monthly_df, output)
+
+def function_cases(df, pdf_max_rows):
+    """Benchmark cases for the analysis functions on one dataset"""
+    aggregates = compute_aggregates(df)
+    index = DateIndex.from_frame(df)
+    cube = AggregateCube.from_frame(df)
+    stats = data.analyze_spending(df, aggregates)
+    statement_summary, monthly_df = data.generate_monthly_statement(df, aggregates)
+    monthly_df = monthly_df.head(pdf_max_rows)
+
+    return {
+        'generate_transactions': lambda: data.generate_transactions(len(df), seed=0),
+        'compute_aggregates': lambda: compute_aggregates(df),
+        'date_index': lambda: DateIndex.from_frame(df),
+        'rolling_totals': lambda: index.rolling_totals(),
+        'aggregate_cube': lambda: AggregateCube.from_frame(df),
+        'cube_drilldown': lambda: cube.query(['merchant', 'weekday'], {'category': ['Travel', 'Shopping']}),
+        'analyze_spending': lambda: data.analyze_spending(df),
+        'generate_ai_summary': lambda: data.generate_ai_summary(stats, df),
+        'compute_insights': lambda: compute_insights(df),
+        'create_charts': lambda: data.create_charts(df),
+        'generate_monthly_statement': lambda: data.generate_monthly_statement(df),
+        'statement_pdf': lambda: render_pdf(monthly_df, statement_summary)
+    }
+
+def route_cases(df):
+    """Benchmark cases that drive each Flask route through the test client"""
+    transaction_store = create_store('memory', loader=lambda: df)
+    app = data.create_app(transaction_store=transaction_store)
+    client = app.test_client()
+
+    def request(path):
+        def run():
+            # Start each request from a cold store so nothing is served from caches. The
+            # PDF and compressed-body caches are keyed on the data's fingerprint, which
+            # survives invalidate(), so they are emptied too
+            transaction_store.invalidate()
+            app.extensions['pdf_cache'].clear()
+            app.extensions['compressed_bodies'].clear()
+            response = client.get(path)
+            response.get_data()
+            assert response.status_code == 200, (path, response.status_code)
+        return run
+
+    return {f"GET {path}": request(path) for path in ROUTES}
+
+def run_suite(sizes, repeat, pdf_max_rows, include_routes=True):
+    results = {}
+    for size in sizes:
+        df = data.generate_transactions(size, seed=0)
+        cases = function_cases(df, pdf_max_rows)
+        if include_routes:
+            cases.update(route_cases(df))
+
+        for name, fn in cases.items():
+            key = f"{name}[{size}]"
+            results[key] = measure(fn, repeat)
+            result = results[key]
+            print(f"{key:<40} {result['seconds']:>10.4f}s {result['peak_bytes'] / 1e6:>10.1f} MB "
+                  f"{result['retained_blocks']:>10} blocks", flush=True)
+    return results
+
+def compare(results, baseline, tolerance):
+    """Return a description of every case that regressed against the baseline"""
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            before, after = baseline[key][metric], result[metric]
+            if before and after > before * (1 + tolerance):
+                regressions.append(f"{key} {metric}: {before} -> {after} (+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--pdf-max-rows', type=int, default=100_000,
+                        help="Cap on statement rows rendered by the PDF case")
+    parser.add_argument('--skip-routes', action='store_true')
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--baseline', help="Compare against results saved with --save-baseline")
+    parser.add_argument('--save-baseline', help="Write results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed slowdown or memory growth before a case counts as a regression")
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, args.repeat, args.pdf_max_rows, not args.skip_routes)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# budgets.py
+import logging
+import threading
+from datetime import datetime
+
+from aggregates import month_key
+
+logger = logging.getLogger(__name__)
+
+# Share of a monthly limit at which a budget counts as nearly spent
+NEAR_LIMIT = 0.8
+
+def current_month():
+    """Rollup key of the current month"""
+    now = datetime.now()
+    return month_key(now.year, now.month)
+
+def budget_status(rollups, budgets, month=None, near=NEAR_LIMIT):
+    """Month-to-date spending against each monthly limit, O(1) per budget from a RollupIndex"""
+    month = month or current_month()
+    statuses = []
+    for category, limit in sorted(budgets.items()):
+        spent = rollups.month_category_total(month, category)
+        used = spent / limit if limit > 0 else float('inf')
+        statuses.append({
+            'category': category,
+            'limit': round(limit, 2),
+            'spent': round(spent, 2),
+            'remaining': round(limit - spent, 2),
+            'used': round(used, 4),
+            'status': 'over' if used > 1 else 'near' if used >= near else 'ok'
+        })
+    return statuses
+
+class BudgetMonitor:
+    """Re-check every budget whenever the transactions change and keep the current alerts.
+
+    Subscribed to a TransactionStore, check() runs on every ingest. Appends
+    update the store's RollupIndex incrementally, so a check costs O(1) per
+    budget whatever the number of stored transactions.
+    """
+
+    def __init__(self, store, near=NEAR_LIMIT):
+        self.store = store
+        self.near = near
+        self.checks = 0
+        self.month = None
+        self.statuses = []
+        self.alerts = []
+        self._lock = threading.Lock()
+
+    def check(self):
+        """Compare month-to-date spending with every budget; returns the budgets over or near their limit"""
+        month = current_month()
+        statuses = budget_status(self.store.rollups(), self.store.budgets(), month, self.near)
+        alerts = [status for status in statuses if status['status'] != 'ok']
+
+        with self._lock:
+            # Only log budgets that have just crossed a threshold
+            previous = {alert['category']: alert['status'] for alert in self.alerts} if self.month == month else {}
+            for alert in alerts:
+                if previous.get(alert['category']) != alert['status']:
+                    logger.warning("Budget %s for %s: $%.2f of $%.2f spent",
+                                   alert['status'], alert['category'], alert['spent'], alert['limit'])
+            self.month, self.statuses, self.alerts = month, statuses, alerts
+            self.checks += 1
+        return alerts
+
+    def current(self):
+        """Statuses and alerts from the latest check, re-checking first when the month has rolled over"""
+        if self.month != current_month():
+            self.check()
+        with self._lock:
+            return self.month, self.statuses, self.alerts
@@ -0,0 +1,66 @@
+# categories.py
+CATEGORIES = {
+    'Food & Dining': ['Restaurant', 'Groceries', 'Coffee Shop', 'Fast Food', 'Supermarket', 'Food Delivery'],
+    'Shopping': ['Amazon', 'Clothing Store', 'Electronics', 'Department Store', 'Online Shopping', 'Home Goods'],
+    'Transportation': ['Gas Station', 'Uber/Lyft', 'Public Transport', 'Parking', 'Car Maintenance', 'Auto Insurance'],
+    'Entertainment': ['Netflix', 'Movies', 'Concert', 'Games', 'Sports', 'Streaming Services'],
+    'Bills & Utilities': ['Electricity', 'Internet', 'Phone Bill', 'Water Bill', 'Rent', 'Mortgage'],
+    'Healthcare': ['Pharmacy', 'Doctor', 'Dental', 'Health Insurance', 'Gym', 'Medical'],
+    'Personal Care': ['Hair Salon', 'Spa', 'Cosmetics', 'Skincare'],
+    'Travel': ['Airline', 'Hotel', 'Vacation', 'Travel Agency']
+}
+
+# Realistic amount ranges based on categories
+AMOUNT_RANGES = {
+    'Food & Dining': (3, 120),
+    'Shopping': (15, 450),
+    'Transportation': (8, 180),
+    'Entertainment': (9, 150),
+    'Bills & Utilities': (25, 800),
+    'Healthcare': (12, 300),
+    'Personal Care': (20, 200),
+    'Travel': (50, 2000)
+}
+
+# Category used for imported transactions that match nothing above
+OTHER_CATEGORY = 'Other'
+
+# Common bank export category names mapped onto the categories above
+CATEGORY_ALIASES = {
+    'food': 'Food & Dining',
+    'dining': 'Food & Dining',
+    'restaurants': 'Food & Dining',
+    'groceries': 'Food & Dining',
+    'food & drink': 'Food & Dining',
+    'shopping': 'Shopping',
+    'merchandise': 'Shopping',
+    'general merchandise': 'Shopping',
+    'transportation': 'Transportation',
+    'transport': 'Transportation',
+    'gas': 'Transportation',
+    'auto & transport': 'Transportation',
+    'entertainment': 'Entertainment',
+    'bills': 'Bills & Utilities',
+    'utilities': 'Bills & Utilities',
+    'bills & utilities': 'Bills & Utilities',
+    'rent': 'Bills & Utilities',
+    'health': 'Healthcare',
+    'healthcare': 'Healthcare',
+    'medical': 'Healthcare',
+    'health & wellness': 'Healthcare',
+    'personal care': 'Personal Care',
+    'personal': 'Personal Care',
+    'travel': 'Travel'
+}
+
+def normalize_category(name):
+    """Map a bank export category name onto a known category, or None if unknown"""
+    if not isinstance(name, str):
+        return None
+    key = ' '.join(name.lower().split())
+    if key in CATEGORY_ALIASES:
+        return CATEGORY_ALIASES[key]
+    for category in CATEGORIES:
+        if category.lower() == key:
+            return category
+    return None
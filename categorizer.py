@@ -0,0 +1,274 @@
+# categorizer.py
+import json
+import re
+from collections import Counter, deque, namedtuple
+
+import numpy as np
+import pandas as pd
+
+from cache import LRUCache
+from categories import CATEGORIES, OTHER_CATEGORY
+
+RULE_KINDS = ('exact', 'prefix', 'contains', 'regex')
+
+# One categorization rule; patterns are matched against lower-cased, space-collapsed merchant names
+Rule = namedtuple('Rule', 'kind pattern category')
+
+# Merchant names and prefixes seen in real bank exports, on top of the names in CATEGORIES.
+# Prefixes match whole words, so run-together spellings get their own rule
+DEFAULT_RULES = [
+    Rule('prefix', 'amzn', 'Shopping'),
+    Rule('prefix', 'amazon', 'Shopping'),
+    Rule('prefix', 'target', 'Shopping'),
+    Rule('prefix', 'walmart', 'Shopping'),
+    Rule('prefix', 'best buy', 'Shopping'),
+    Rule('prefix', 'uber eats', 'Food & Dining'),
+    Rule('prefix', 'uber', 'Transportation'),
+    Rule('prefix', 'lyft', 'Transportation'),
+    Rule('prefix', 'shell', 'Transportation'),
+    Rule('prefix', 'chevron', 'Transportation'),
+    Rule('prefix', 'exxon', 'Transportation'),
+    Rule('prefix', 'exxonmobil', 'Transportation'),
+    Rule('prefix', 'starbucks', 'Food & Dining'),
+    Rule('prefix', 'mcdonald', 'Food & Dining'),
+    Rule('prefix', 'mcdonalds', 'Food & Dining'),
+    Rule('prefix', 'chipotle', 'Food & Dining'),
+    Rule('prefix', 'doordash', 'Food & Dining'),
+    Rule('prefix', 'grubhub', 'Food & Dining'),
+    Rule('prefix', 'whole foods', 'Food & Dining'),
+    Rule('prefix', 'trader joe', 'Food & Dining'),
+    Rule('prefix', 'trader joes', 'Food & Dining'),
+    Rule('prefix', 'kroger', 'Food & Dining'),
+    Rule('prefix', 'spotify', 'Entertainment'),
+    Rule('prefix', 'hulu', 'Entertainment'),
+    Rule('prefix', 'steam', 'Entertainment'),
+    Rule('prefix', 'steamgames', 'Entertainment'),
+    Rule('prefix', 'steampowered', 'Entertainment'),
+    Rule('prefix', 'comcast', 'Bills & Utilities'),
+    Rule('prefix', 'verizon', 'Bills & Utilities'),
+    Rule('prefix', 'at&t', 'Bills & Utilities'),
+    Rule('prefix', 't-mobile', 'Bills & Utilities'),
+    Rule('prefix', 'cvs', 'Healthcare'),
+    Rule('prefix', 'walgreens', 'Healthcare'),
+    Rule('prefix', 'sephora', 'Personal Care'),
+    Rule('prefix', 'ulta', 'Personal Care'),
+    Rule('prefix', 'delta air', 'Travel'),
+    Rule('prefix', 'united airlines', 'Travel'),
+    Rule('prefix', 'marriott', 'Travel'),
+    Rule('prefix', 'hilton', 'Travel'),
+    Rule('prefix', 'airbnb', 'Travel'),
+    Rule('prefix', 'expedia', 'Travel'),
+    Rule('regex', r'\b(?:air(?:lines?|ways)|flights?)\b', 'Travel'),
+    Rule('regex', r'\b(?:hotels?|inn|resort|motel)\b', 'Travel'),
+    Rule('regex', r'\b(?:cafe|coffee|bakery|pizza|grill|bistro|diner|kitchen|burger|sushi)\b', 'Food & Dining'),
+    Rule('regex', r'\b(?:fuel|petrol|gas|parking|toll|transit|taxi)\b', 'Transportation'),
+    Rule('regex', r'\b(?:pharmacy|clinic|dental|dentist|hospital|medical|optical)\b', 'Healthcare'),
+    Rule('regex', r'\b(?:electric|energy|water|utility|utilities|internet|wireless|mobile)\b', 'Bills & Utilities'),
+    Rule('regex', r'\b(?:salon|barber|spa|nails|beauty)\b', 'Personal Care'),
+    Rule('regex', r'\b(?:cinema|theat(?:er|re)|tickets?|games?)\b', 'Entertainment'),
+]
+
+def normalize_merchant_key(merchant):
+    """Key rules are matched against: lower case with runs of whitespace collapsed"""
+    return ' '.join(str(merchant).lower().split())
+
+def default_rules():
+    """Every known merchant name as an exact and a substring rule, followed by DEFAULT_RULES"""
+    rules = []
+    for category, merchants in CATEGORIES.items():
+        for merchant in merchants:
+            rules.append(Rule('exact', merchant, category))
+            rules.append(Rule('contains', merchant, category))
+    return rules + DEFAULT_RULES
+
+def load_rules(path):
+    """Read rules from a JSON list of {"kind", "pattern", "category"} objects"""
+    with open(path, encoding='utf-8') as f:
+        entries = json.load(f)
+    rules = [Rule(entry['kind'], entry['pattern'], entry['category']) for entry in entries]
+    for rule in rules:
+        if rule.kind not in RULE_KINDS:
+            raise ValueError(f"Unknown rule kind {rule.kind!r} in {path}; expected one of {', '.join(RULE_KINDS)}")
+    return rules
+
+def is_boundary(text, position):
+    """True when position is at either end of text or next to a character that is not a letter or digit"""
+    return position <= 0 or position >= len(text) or not (text[position - 1].isalnum() and text[position].isalnum())
+
+class PrefixTrie:
+    """Character trie answering 'longest rule prefix of this string' in O(len(string)).
+
+    A prefix only matches whole words: "target" matches "target store" but
+    not "targeted ads".
+    """
+
+    def __init__(self, rules):
+        self.root = {}
+        for pattern, category in rules:
+            node = self.root
+            for char in pattern:
+                node = node.setdefault(char, {})
+            # The first rule for a prefix wins
+            node.setdefault(None, category)
+
+    def longest_prefix(self, text):
+        """Category of the longest matching prefix that ends at a word boundary, or None"""
+        node, found = self.root, None
+        for position, char in enumerate(text):
+            node = node.get(char)
+            if node is None:
+                break
+            if None in node and is_boundary(text, position + 1):
+                found = node[None]
+        return found
+
+class AhoCorasick:
+    """Automaton finding every rule substring of a string in one pass over it.
+
+    A substring only matches whole words: "spa" matches "day spa" but not
+    "spanish tapas".
+    """
+
+    def __init__(self, rules):
+        self.goto = [{}]
+        self.fail = [0]
+        # Patterns ending at each state (following failure links), as (length, order, category), longest first
+        self.output = [[]]
+        for order, (pattern, category) in enumerate(rules):
+            state = 0
+            for char in pattern:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            if not self.output[state]:
+                self.output[state] = [(len(pattern), -order, category)]
+
+        # Breadth-first pass filling in failure links and inherited outputs
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                inherited = self.output[self.fail[child]]
+                if inherited:
+                    self.output[child] = sorted(self.output[child] + inherited, reverse=True)
+                queue.append(child)
+
+    def best_match(self, text):
+        """Category of the longest whole-word pattern found in text (earliest rule on ties), or None"""
+        state, best = 0, None
+        for position, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            end = position + 1
+            for found in self.output[state]:
+                if best is not None and found <= best:
+                    break
+                if is_boundary(text, end - found[0]) and is_boundary(text, end):
+                    best = found
+                    break
+        return best[2] if best else None
+
+class Categorizer:
+    """Classify merchant strings with compiled exact, prefix, substring and regex rules.
+
+    Rule kinds are tried in that order: an exact name match, then the longest
+    matching prefix, then the longest substring (the earliest rule on ties),
+    then the first regex rule in rule order that matches. Prefix and
+    substring rules only match whole words. Results are memoized per raw
+    merchant string in an LRU cache, and report() gives the hit rates of
+    the cache and of each kind of rule.
+    """
+
+    def __init__(self, rules=None, default=OTHER_CATEGORY, memo_size=100_000):
+        rules = default_rules() if rules is None else list(rules)
+        self.default = default
+        self.exact = {}
+        for rule in rules:
+            if rule.kind == 'exact':
+                self.exact.setdefault(normalize_merchant_key(rule.pattern), rule.category)
+        self.prefixes = PrefixTrie(
+            (normalize_merchant_key(rule.pattern), rule.category) for rule in rules if rule.kind == 'prefix'
+        )
+        self.substrings = AhoCorasick(
+            [(normalize_merchant_key(rule.pattern), rule.category) for rule in rules if rule.kind == 'contains']
+        )
+        # Tried one by one in rule order: a single alternation would find the
+        # match earliest in the string rather than the first matching rule
+        self.regexes = [(re.compile(rule.pattern), rule.category) for rule in rules if rule.kind == 'regex']
+
+        self.memo = LRUCache(max_entries=memo_size)
+        self.rows = Counter()
+
+    def match(self, merchant):
+        """(category, rule kind) for one merchant, without the memo or statistics"""
+        key = normalize_merchant_key(merchant)
+        if key in self.exact:
+            return self.exact[key], 'exact'
+        category = self.prefixes.longest_prefix(key)
+        if category is not None:
+            return category, 'prefix'
+        category = self.substrings.best_match(key)
+        if category is not None:
+            return category, 'contains'
+        for pattern, category in self.regexes:
+            if pattern.search(key):
+                return category, 'regex'
+        return self.default, 'unmatched'
+
+    def lookup(self, merchant):
+        """Memoized match()"""
+        missing = object()
+        result = self.memo.get(merchant, missing)
+        if result is missing:
+            result = self.match(merchant)
+            self.memo.put(merchant, result)
+        return result
+
+    def categorize(self, merchant):
+        """Category for one merchant string"""
+        category, kind = self.lookup(merchant)
+        self.rows[kind] += 1
+        return category
+
+    def categorize_series(self, merchants):
+        """Categories for a Series of merchants, classifying each distinct merchant once"""
+        codes, uniques = pd.factorize(merchants.astype(str))
+        results = [self.lookup(merchant) for merchant in uniques]
+        occurrences = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        for (_, kind), count in zip(results, occurrences):
+            self.rows[kind] += int(count)
+        categories = np.array([category for category, _ in results] + [self.default], dtype=object)
+        return pd.Series(categories[codes], index=merchants.index)
+
+    def report(self):
+        """Rows classified by each kind of rule, the share matched by any rule, and the memo hit rate"""
+        rows = sum(self.rows.values())
+        lookups = self.memo.hits + self.memo.misses
+        return {
+            'rows': rows,
+            'by_rule': {kind: self.rows[kind] for kind in RULE_KINDS + ('unmatched',)},
+            'match_rate': round(1 - self.rows['unmatched'] / rows, 4) if rows else None,
+            'memo_hit_rate': round(self.memo.hits / lookups, 4) if lookups else None,
+            'distinct_merchants': len(self.memo)
+        }
+
+_default_categorizer = None
+
+def default_categorizer():
+    """Shared Categorizer built from the default rules"""
+    global _default_categorizer
+    if _default_categorizer is None:
+        _default_categorizer = Categorizer()
+    return _default_categorizer
+
+def categorize_merchant(merchant):
+    """Guess a merchant's category with the default rules"""
+    return default_categorizer().categorize(merchant)
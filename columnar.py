@@ -0,0 +1,86 @@
+# columnar.py
+import numpy as np
+import pandas as pd
+
+def code_dtype(size):
+    """Smallest signed integer dtype that can index a dictionary of this size"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if size <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+def encode(column):
+    """Dictionary-encode a column into (codes, dictionary)"""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes, dictionary = column.cat.codes.to_numpy(), column.cat.categories
+    else:
+        codes, dictionary = pd.factorize(column)
+    dictionary = np.asarray(dictionary, dtype=object)
+    return codes.astype(code_dtype(len(dictionary))), dictionary
+
+def concat_transactions(frames):
+    """Combine transaction frames into one ordered by date, newest first; ties keep the frames' order"""
+    combined = pd.concat(frames, ignore_index=True)
+    for column in ('merchant', 'category'):
+        if not isinstance(combined[column].dtype, pd.CategoricalDtype):
+            combined[column] = combined[column].astype('category')
+    return combined.sort_values('date', ascending=False, kind='stable', ignore_index=True)
+
+class TransactionTable:
+    """Transactions stored as integer cents, int32 day numbers and dictionary-encoded strings"""
+
+    def __init__(self, amount_cents, days, category_codes, categories, merchant_codes, merchants):
+        self.amount_cents = amount_cents
+        self.days = days
+        self.category_codes = category_codes
+        self.categories = categories
+        self.merchant_codes = merchant_codes
+        self.merchants = merchants
+
+    @classmethod
+    def from_frame(cls, df):
+        """Encode a transactions DataFrame"""
+        cents = np.rint(df['amount'].to_numpy(dtype=np.float64) * 100)
+        cents_dtype = np.int32 if len(cents) == 0 or np.abs(cents).max() <= np.iinfo(np.int32).max else np.int64
+        days = df['date'].to_numpy().astype('datetime64[D]').astype(np.int32)
+        category_codes, categories = encode(df['category'])
+        merchant_codes, merchants = encode(df['merchant'])
+        return cls(cents.astype(cents_dtype), days, category_codes, categories, merchant_codes, merchants)
+
+    def to_frame(self):
+        """Decode back to the DataFrame layout the analysis functions expect"""
+        return pd.DataFrame({
+            'date': self.days.astype('datetime64[D]').astype('datetime64[ns]'),
+            'amount': self.amount_cents / 100,
+            'merchant': pd.Categorical.from_codes(self.merchant_codes, categories=self.merchants),
+            'category': pd.Categorical.from_codes(self.category_codes, categories=self.categories)
+        })
+
+    def records(self, start=0, stop=None):
+        """Rows start:stop as dicts, decoding only those rows"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        dates = self.days[start:stop].astype('datetime64[D]').astype('datetime64[ns]')
+        return [
+            {
+                'date': pd.Timestamp(date),
+                'amount': int(cents) / 100,
+                'merchant': self.merchants[merchant],
+                'category': self.categories[category]
+            }
+            for date, cents, merchant, category in zip(
+                dates,
+                self.amount_cents[start:stop],
+                self.merchant_codes[start:stop],
+                self.category_codes[start:stop]
+            )
+        ]
+
+    @property
+    def nbytes(self):
+        """Approximate memory used by the columns and dictionaries"""
+        arrays = (self.amount_cents, self.days, self.category_codes, self.merchant_codes)
+        dictionaries = sum(len(value) for value in self.categories) + sum(len(value) for value in self.merchants)
+        return sum(array.nbytes for array in arrays) + dictionaries
+
+    def __len__(self):
+        return len(self.amount_cents)
@@ -0,0 +1,118 @@
+# cube.py
+import numpy as np
+import pandas as pd
+
+from aggregates import DAY_ORDER
+from columnar import code_dtype, encode
+
+DIMENSIONS = ('category', 'merchant', 'month', 'weekday')
+
+class AggregateCube:
+    """Spending pre-aggregated over category x merchant x month x weekday.
+
+    Only non-empty cells are stored: one array of dictionary codes per
+    dimension plus integer-cent totals and counts, so the cube stays about
+    as small as the number of distinct combinations rather than the number
+    of transactions. Queries filter and regroup cells, never rows.
+    """
+
+    def __init__(self, codes, dictionaries, cents, counts):
+        self.codes = codes
+        self.dictionaries = dictionaries
+        self.cents = cents
+        self.counts = counts
+        self._lookups = {
+            dimension: {value: code for code, value in enumerate(dictionary)}
+            for dimension, dictionary in dictionaries.items()
+        }
+
+    @classmethod
+    def from_frame(cls, df):
+        """Aggregate a transactions frame into cube cells"""
+        category_codes, categories = encode(df['category'])
+        merchant_codes, merchants = encode(df['merchant'])
+        months = df['date'].to_numpy().astype('datetime64[M]').astype(np.int64)
+        first_month = months.min() if len(months) else 0
+        month_codes = months - first_month
+        n_months = int(month_codes.max()) + 1 if len(months) else 0
+        days = df['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+        weekday_codes = (days + 3) % 7  # 1970-01-01 was a Thursday
+        cents = np.rint(df['amount'].to_numpy(dtype=np.float64) * 100).astype(np.int64)
+
+        # One integer key per cell; the distinct keys are the non-empty cells
+        sizes = (len(categories), len(merchants), n_months, 7)
+        keys = np.ravel_multi_index(
+            (category_codes.astype(np.int64), merchant_codes.astype(np.int64), month_codes, weekday_codes), sizes
+        ) if len(df) else np.zeros(0, dtype=np.int64)
+        cells, inverse = np.unique(keys, return_inverse=True)
+        cell_codes = np.unravel_index(cells, sizes) if len(cells) else [np.zeros(0, dtype=np.int64)] * 4
+
+        dictionaries = {
+            'category': np.asarray(categories, dtype=object).astype(str),
+            'merchant': np.asarray(merchants, dtype=object).astype(str),
+            'month': (np.arange(n_months) + first_month).astype('datetime64[M]').astype(str),
+            'weekday': np.array(DAY_ORDER)
+        }
+        codes = {
+            dimension: values.astype(code_dtype(len(dictionaries[dimension])))
+            for dimension, values in zip(DIMENSIONS, cell_codes)
+        }
+        return cls(
+            codes,
+            dictionaries,
+            np.bincount(inverse, weights=cents, minlength=len(cells)).astype(np.int64),
+            np.bincount(inverse, minlength=len(cells)).astype(np.int64)
+        )
+
+    def __len__(self):
+        return len(self.cents)
+
+    @property
+    def nbytes(self):
+        """Memory held by the cell arrays"""
+        return self.cents.nbytes + self.counts.nbytes + sum(codes.nbytes for codes in self.codes.values())
+
+    def members(self, dimension):
+        """Every value of one dimension"""
+        return list(self.dictionaries[dimension])
+
+    def query(self, group_by=('category',), filters=None, limit=None):
+        """Totals, counts and averages grouped by some dimensions, over the cells matching filters.
+
+        filters maps a dimension to the values to keep, e.g.
+        {'month': ['2024-05'], 'category': ['Travel']}. Unknown dimensions
+        raise ValueError; unknown values simply match nothing. Returns a
+        DataFrame sorted by total, largest first.
+        """
+        for dimension in list(group_by) + list(filters or {}):
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"Unknown dimension {dimension!r}; expected one of {', '.join(DIMENSIONS)}")
+
+        mask = np.ones(len(self), dtype=bool)
+        for dimension, values in (filters or {}).items():
+            lookup = self._lookups[dimension]
+            wanted = [lookup[value] for value in values if value in lookup]
+            mask &= np.isin(self.codes[dimension], wanted)
+        cents, counts = self.cents[mask], self.counts[mask]
+
+        if group_by:
+            sizes = tuple(len(self.dictionaries[dimension]) for dimension in group_by)
+            keys = np.ravel_multi_index(tuple(self.codes[dimension][mask].astype(np.int64) for dimension in group_by), sizes)
+            groups, inverse = np.unique(keys, return_inverse=True)
+            group_codes = np.unravel_index(groups, sizes)
+            columns = {
+                dimension: self.dictionaries[dimension][codes]
+                for dimension, codes in zip(group_by, group_codes)
+            }
+            cents = np.bincount(inverse, weights=cents, minlength=len(groups))
+            counts = np.bincount(inverse, weights=counts, minlength=len(groups)).astype(np.int64)
+        else:
+            columns = {}
+            cents, counts = np.array([cents.sum()]), np.array([counts.sum()])
+
+        result = pd.DataFrame(columns)
+        result['total'] = np.round(cents / 100, 2)
+        result['count'] = counts
+        result['average'] = np.round(np.divide(cents / 100, counts, out=np.zeros(len(counts)), where=counts > 0), 2)
+        result = result.sort_values('total', ascending=False, kind='stable', ignore_index=True)
+        return result.head(limit) if limit else result
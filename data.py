@@ -1,623 +1,165 @@
 # data.py
-from flask import Flask, render_template, jsonify, send_file
+from flask import Blueprint, Flask, Response, current_app, render_template, jsonify, request, send_file
+from werkzeug.local import LocalProxy
 import pandas as pd
-import random
+import numpy as np
 from datetime import datetime, timedelta
-import plotly.express as px
-import plotly.io as pio
 import json
 import os
-import io
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
+import tempfile
 import base64
-
-app = Flask(__name__)
-
-def ensure_template_directory():
-    """Create templates directory if it doesn't exist"""
-    if not os.path.exists('templates'):
-        os.makedirs('templates')
-        print("Created templates directory")
-    
-    # Create index.html if it doesn't exist
-    index_path = os.path.join('templates', 'index.html')
-    if not os.path.exists(index_path):
-        with open(index_path, 'w', encoding='utf-8') as f:
-            f.write("""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>AI Spending Analyzer</title>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }
-
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-        }
-
-        .header {
-            text-align: center;
-            color: white;
-            margin-bottom: 30px;
-            padding: 20px;
-        }
-
-        .header h1 {
-            font-size: 2.5em;
-            margin-bottom: 10px;
-        }
-
-        .header p {
-            font-size: 1.2em;
-            opacity: 0.9;
-        }
-
-        .btn-group {
-            display: flex;
-            gap: 15px;
-            justify-content: center;
-            margin-top: 15px;
-            flex-wrap: wrap;
-        }
-
-        .btn {
-            background: rgba(255, 255, 255, 0.2);
-            color: white;
-            border: 2px solid white;
-            padding: 12px 30px;
-            border-radius: 25px;
-            cursor: pointer;
-            font-size: 16px;
-            transition: all 0.3s ease;
-        }
-
-        .btn:hover {
-            background: white;
-            color: #667eea;
-        }
-
-        .stats-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-
-        .stat-card {
-            background: white;
-            padding: 25px;
-            border-radius: 15px;
-            text-align: center;
-            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.1);
-            transition: transform 0.3s ease;
-        }
-
-        .stat-card:hover {
-            transform: translateY(-5px);
-        }
-
-        .stat-card h3 {
-            color: #666;
-            font-size: 0.9em;
-            margin-bottom: 10px;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }
-
-        .stat-card h2 {
-            color: #333;
-            font-size: 1.8em;
-            font-weight: bold;
-        }
-
-        .ai-summary {
-            background: white;
-            padding: 30px;
-            border-radius: 15px;
-            margin-bottom: 30px;
-            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.1);
-            line-height: 1.6;
-        }
-
-        .ai-summary h3 {
-            color: #667eea;
-            margin-bottom: 15px;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }
-
-        .charts-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(400px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-
-        .chart-container {
-            background: white;
-            padding: 20px;
-            border-radius: 15px;
-            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.1);
-        }
-
-        .chart-container .plotly-graph-div {
-            width: 100% !important;
-        }
-
-        .transactions-section {
-            background: white;
-            padding: 30px;
-            border-radius: 15px;
-            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.1);
-        }
-
-        .transactions-section h3 {
-            color: #333;
-            margin-bottom: 20px;
-        }
-
-        .transactions-table {
-            width: 100%;
-            border-collapse: collapse;
-        }
-
-        .transactions-table th,
-        .transactions-table td {
-            padding: 12px 15px;
-            text-align: left;
-            border-bottom: 1px solid #eee;
-        }
-
-        .transactions-table th {
-            background: #f8f9fa;
-            font-weight: 600;
-            color: #555;
-        }
-
-        .transactions-table tr:hover {
-            background: #f8f9fa;
-        }
-
-        .category-badge {
-            background: #667eea;
-            color: white;
-            padding: 4px 12px;
-            border-radius: 15px;
-            font-size: 0.8em;
-            font-weight: 500;
-        }
-
-        .amount-positive {
-            color: #27ae60;
-            font-weight: 600;
-        }
-
-        .amount-high {
-            color: #e74c3c;
-            font-weight: 600;
-        }
-
-        .loading {
-            display: none;
-            text-align: center;
-            padding: 20px;
-            color: #666;
-        }
-
-        .statement-section {
-            background: white;
-            padding: 30px;
-            border-radius: 15px;
-            margin-bottom: 30px;
-            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.1);
-        }
-
-        .statement-section h3 {
-            color: #333;
-            margin-bottom: 20px;
-        }
-
-        .statement-summary {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 15px;
-            margin-bottom: 20px;
-        }
-
-        .statement-item {
-            padding: 15px;
-            background: #f8f9fa;
-            border-radius: 10px;
-            text-align: center;
-        }
-
-        .statement-item h4 {
-            color: #666;
-            font-size: 0.9em;
-            margin-bottom: 5px;
-        }
-
-        .statement-item .value {
-            color: #333;
-            font-size: 1.2em;
-            font-weight: bold;
-        }
-
-        @media (max-width: 768px) {
-            .charts-grid {
-                grid-template-columns: 1fr;
-            }
-            
-            .stats-grid {
-                grid-template-columns: repeat(2, 1fr);
-            }
-            
-            .header h1 {
-                font-size: 2em;
-            }
-            
-            .btn-group {
-                flex-direction: column;
-                align-items: center;
-            }
-            
-            .btn {
-                width: 100%;
-                max-width: 300px;
-            }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <!-- Header -->
-        <div class="header">
-            <h1>💰 AI Spending Analyzer</h1>
-            <p>Smart insights into your spending habits powered by AI</p>
-            <div class="btn-group">
-                <button class="btn" onclick="refreshData()">
-                    🔄 Generate New Data
-                </button>
-                <button class="btn" onclick="generateStatement()">
-                    📄 Generate Monthly Statement
-                </button>
-                <button class="btn" onclick="downloadStatement()">
-                    💾 Download PDF Statement
-                </button>
-            </div>
-        </div>
-
-        <!-- Statistics -->
-        <div class="stats-grid">
-            <div class="stat-card">
-                <h3>Total Spent</h3>
-                <h2 id="totalSpent">${{ stats.total_spent }}</h2>
-            </div>
-            <div class="stat-card">
-                <h3>Total Transactions</h3>
-                <h2 id="totalTransactions">{{ stats.total_transactions }}</h2>
-            </div>
-            <div class="stat-card">
-                <h3>Average Transaction</h3>
-                <h2 id="avgTransaction">${{ stats.average_transaction }}</h2>
-            </div>
-            <div class="stat-card">
-                <h3>Top Category</h3>
-                <h2 id="topCategory">{{ stats.favorite_category }}</h2>
-            </div>
-        </div>
-
-        <!-- Monthly Statement Summary -->
-        <div class="statement-section">
-            <h3>Monthly Statement Summary</h3>
-            <div class="statement-summary">
-                <div class="statement-item">
-                    <h4>Current Month Spending</h4>
-                    <div class="value" id="monthSpending">${{ stats.this_month_spending }}</div>
-                </div>
-                <div class="statement-item">
-                    <h4>Month Transactions</h4>
-                    <div class="value" id="monthTransactions">{{ stats.transactions_this_month }}</div>
-                </div>
-                <div class="statement-item">
-                    <h4>Daily Average</h4>
-                    <div class="value" id="dailyAverage">${{ stats.daily_average }}</div>
-                </div>
-                <div class="statement-item">
-                    <h4>Statement Period</h4>
-                    <div class="value" id="statementPeriod">{{ stats.statement_period }}</div>
-                </div>
-            </div>
-        </div>
-
-        <!-- AI Summary -->
-        <div class="ai-summary">
-            <h3>AI Spending Analysis</h3>
-            <p id="aiSummary">{{ ai_summary }}</p>
-        </div>
-
-        <!-- Charts -->
-        <div class="charts-grid">
-            <div class="chart-container">
-                {{ category_chart|safe }}
-            </div>
-            <div class="chart-container">
-                {{ monthly_chart|safe }}
-            </div>
-            <div class="chart-container">
-                {{ daily_chart|safe }}
-            </div>
-        </div>
-
-        <!-- Recent Transactions -->
-        <div class="transactions-section">
-            <h3>Recent Transactions</h3>
-            <div class="loading" id="loadingIndicator">
-                Loading new data...
-            </div>
-            <table class="transactions-table">
-                <thead>
-                    <tr>
-                        <th>Date</th>
-                        <th>Merchant</th>
-                        <th>Category</th>
-                        <th>Amount</th>
-                    </tr>
-                </thead>
-                <tbody id="transactionsBody">
-                    {% for transaction in recent_transactions %}
-                    <tr>
-                        <td>{{ transaction.date }}</td>
-                        <td>{{ transaction.merchant }}</td>
-                        <td>
-                            <span class="category-badge">{{ transaction.category }}</span>
-                        </td>
-                        <td class="{% if transaction.amount > 100 %}amount-high{% else %}amount-positive{% endif %}">
-                            ${{ "%.2f"|format(transaction.amount) }}
-                        </td>
-                    </tr>
-                    {% endfor %}
-                </tbody>
-            </table>
-        </div>
-    </div>
-
-    <script>
-        // This JavaScript function communicates with data.py
-        async function refreshData() {
-            const button = document.querySelector('.btn');
-            const loading = document.getElementById('loadingIndicator');
-            const transactionsBody = document.getElementById('transactionsBody');
-            
-            // Show loading
-            button.disabled = true;
-            button.innerHTML = '🔄 Generating...';
-            loading.style.display = 'block';
-            transactionsBody.innerHTML = '';
-            
-            try {
-                // Call the /refresh endpoint in data.py
-                const response = await fetch('/refresh');
-                const data = await response.json();
-                
-                // Update statistics with data from Python
-                document.getElementById('totalSpent').textContent = '$' + data.stats.total_spent.toFixed(2);
-                document.getElementById('totalTransactions').textContent = data.stats.total_transactions;
-                document.getElementById('avgTransaction').textContent = '$' + data.stats.average_transaction.toFixed(2);
-                document.getElementById('topCategory').textContent = data.stats.favorite_category;
-                document.getElementById('monthSpending').textContent = '$' + data.stats.this_month_spending.toFixed(2);
-                document.getElementById('monthTransactions').textContent = data.stats.transactions_this_month;
-                document.getElementById('dailyAverage').textContent = '$' + data.stats.daily_average.toFixed(2);
-                document.getElementById('statementPeriod').textContent = data.stats.statement_period;
-                
-                // Update AI summary with data from Python
-                document.getElementById('aiSummary').textContent = data.ai_summary;
-                
-                // Update transactions table with data from Python
-                transactionsBody.innerHTML = data.recent_transactions.map(transaction => `
-                    <tr>
-                        <td>${transaction.date}</td>
-                        <td>${transaction.merchant}</td>
-                        <td><span class="category-badge">${transaction.category}</span></td>
-                        <td class="${transaction.amount > 100 ? 'amount-high' : 'amount-positive'}">
-                            $${transaction.amount.toFixed(2)}
-                        </td>
-                    </tr>
-                `).join('');
-                
-                // Reload page to refresh charts (they need full page reload)
-                setTimeout(() => {
-                    location.reload();
-                }, 1000);
-                
-            } catch (error) {
-                console.error('Error refreshing data:', error);
-                alert('Error refreshing data. Please try again.');
-            } finally {
-                button.disabled = false;
-                button.innerHTML = '🔄 Generate New Data';
-                loading.style.display = 'none';
-            }
-        }
-
-        async function generateStatement() {
-            try {
-                const response = await fetch('/generate_statement');
-                const data = await response.json();
-                
-                // Update statement summary
-                document.getElementById('monthSpending').textContent = '$' + data.statement_summary.current_month_spending.toFixed(2);
-                document.getElementById('monthTransactions').textContent = data.statement_summary.transactions_this_month;
-                document.getElementById('dailyAverage').textContent = '$' + data.statement_summary.daily_average.toFixed(2);
-                document.getElementById('statementPeriod').textContent = data.statement_summary.statement_period;
-                
-                alert('Monthly statement generated successfully!');
-                
-            } catch (error) {
-                console.error('Error generating statement:', error);
-                alert('Error generating statement. Please try again.');
-            }
-        }
-
-        async function downloadStatement() {
-            try {
-                const response = await fetch('/download_statement');
-                const blob = await response.blob();
-                
-                // Create download link
-                const url = window.URL.createObjectURL(blob);
-                const a = document.createElement('a');
-                a.style.display = 'none';
-                a.href = url;
-                a.download = 'monthly_statement.pdf';
-                
-                document.body.appendChild(a);
-                a.click();
-                window.URL.revokeObjectURL(url);
-                document.body.removeChild(a);
-                
-            } catch (error) {
-                console.error('Error downloading statement:', error);
-                alert('Error downloading statement. Please try again.');
-            }
-        }
-    </script>
-</body>
-</html>""")
-        print("📄 Created index.html template")
-
-# Call this function before running the app
-ensure_template_directory()
-
-def generate_transactions(num_records=150):
+import hashlib
+import io
+from store import create_store
+from aggregates import compute_aggregates, month_key
+from date_index import ROLLING_WINDOWS, DateIndex, day_start
+from insights import compute_insights
+from budgets import BudgetMonitor
+from live import MAX_SUBSCRIBERS, LiveUpdates
+from cube import DIMENSIONS, AggregateCube
+from lod import GRANULARITIES, GRANULARITY_ADJECTIVES, MAX_POINTS, trend_series
+from cache import LRUCache
+from categories import AMOUNT_RANGES, CATEGORIES
+from metrics import Metrics, init_app as init_metrics, stage
+from precompute import DashboardPrecomputer
+from http_cache import conditional, dataset_fingerprint, init_app as init_http_cache
+from batch_statements import frame_statements, statement_pool, zip_stream
+
+# Plotly and reportlab are imported inside the chart and PDF functions so
+# workers only pay for them once those paths are first used
+
+bp = Blueprint('spending', __name__)
+
+# Per-application state, created by create_app()
+store = LocalProxy(lambda: current_app.extensions['transaction_store'])
+chart_cache = LocalProxy(lambda: current_app.extensions['chart_cache'])
+metrics = LocalProxy(lambda: current_app.extensions['metrics'])
+dashboard = LocalProxy(lambda: current_app.extensions['dashboard'])
+pdf_cache = LocalProxy(lambda: current_app.extensions['pdf_cache'])
+budget_monitor = LocalProxy(lambda: current_app.extensions['budget_monitor'])
+
+def generate_transactions(num_records=150, seed=None):
     """Generate realistic transaction data with accurate spending patterns"""
-    categories = {
-        'Food & Dining': ['Restaurant', 'Groceries', 'Coffee Shop', 'Fast Food', 'Supermarket', 'Food Delivery'],
-        'Shopping': ['Amazon', 'Clothing Store', 'Electronics', 'Department Store', 'Online Shopping', 'Home Goods'],
-        'Transportation': ['Gas Station', 'Uber/Lyft', 'Public Transport', 'Parking', 'Car Maintenance', 'Auto Insurance'],
-        'Entertainment': ['Netflix', 'Movies', 'Concert', 'Games', 'Sports', 'Streaming Services'],
-        'Bills & Utilities': ['Electricity', 'Internet', 'Phone Bill', 'Water Bill', 'Rent', 'Mortgage'],
-        'Healthcare': ['Pharmacy', 'Doctor', 'Dental', 'Health Insurance', 'Gym', 'Medical'],
-        'Personal Care': ['Hair Salon', 'Spa', 'Cosmetics', 'Skincare'],
-        'Travel': ['Airline', 'Hotel', 'Vacation', 'Travel Agency']
-    }
-    
-    transactions = []
-    start_date = datetime.now() - timedelta(days=90)
-    
-    # Generate more transactions for current month to simulate realistic patterns
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    
-    for _ in range(num_records):
-        category = random.choice(list(categories.keys()))
-        merchant = random.choice(categories[category])
-        
-        # Realistic amount ranges based on categories
-        amount_ranges = {
-            'Food & Dining': (3, 120),
-            'Shopping': (15, 450),
-            'Transportation': (8, 180),
-            'Entertainment': (9, 150),
-            'Bills & Utilities': (25, 800),
-            'Healthcare': (12, 300),
-            'Personal Care': (20, 200),
-            'Travel': (50, 2000)
-        }
-        
-        min_amt, max_amt = amount_ranges[category]
-        
-        # Create more realistic distribution (fewer large transactions)
-        if random.random() < 0.8:  # 80% of transactions are smaller
-            amount = round(random.uniform(min_amt, max_amt * 0.4), 2)
-        else:  # 20% are larger transactions
-            amount = round(random.uniform(max_amt * 0.4, max_amt), 2)
-        
-        # Weight transactions towards current month
-        if random.random() < 0.6:  # 60% of transactions in current month
-            days_ago = random.randint(0, 30)
-        else:
-            days_ago = random.randint(31, 90)
-            
-        transaction_date = (start_date + timedelta(days=days_ago)).strftime('%Y-%m-%d')
-        
-        transactions.append({
-            'date': transaction_date,
-            'amount': amount,
-            'merchant': merchant,
-            'category': category
-        })
-    
-    df = pd.DataFrame(transactions)
-    df['date'] = pd.to_datetime(df['date'])
-    return df.sort_values('date', ascending=False)
-
-def analyze_spending(df):
+    rng = np.random.default_rng(seed)
+    category_names = list(CATEGORIES.keys())
+    merchant_names = [merchant for name in category_names for merchant in CATEGORIES[name]]
+    
+    # Per-category lookup tables so every column is drawn as a whole array
+    merchant_counts = np.array([len(CATEGORIES[name]) for name in category_names])
+    merchant_offsets = np.concatenate(([0], np.cumsum(merchant_counts)[:-1]))
+    min_amounts = np.array([AMOUNT_RANGES[name][0] for name in category_names], dtype=float)
+    max_amounts = np.array([AMOUNT_RANGES[name][1] for name in category_names], dtype=float)
+    
+    category_codes = rng.integers(0, len(category_names), size=num_records)
+    merchant_codes = merchant_offsets[category_codes] + (
+        rng.random(num_records) * merchant_counts[category_codes]
+    ).astype(np.int64)
+    
+    # Create more realistic distribution (fewer large transactions):
+    # 80% of transactions are smaller, 20% are larger
+    min_amt = min_amounts[category_codes]
+    max_amt = max_amounts[category_codes]
+    small = rng.random(num_records) < 0.8
+    low = np.where(small, min_amt, max_amt * 0.4)
+    high = np.where(small, max_amt * 0.4, max_amt)
+    amounts = np.round(rng.uniform(low, high), 2)
+    
+    # Weight transactions towards current month (60% in the last 30 days)
+    recent = rng.random(num_records) < 0.6
+    days_ago = np.where(
+        recent,
+        rng.integers(0, 31, size=num_records),
+        rng.integers(31, 91, size=num_records)
+    )
+    today = np.datetime64(datetime.now().date(), 'D')
+    dates = (today - days_ago.astype('timedelta64[D]')).astype('datetime64[ns]')
+    
+    df = pd.DataFrame({
+        'date': dates,
+        'amount': amounts,
+        'merchant': pd.Categorical.from_codes(merchant_codes, categories=merchant_names),
+        'category': pd.Categorical.from_codes(category_codes, categories=category_names)
+    })
+    return df.sort_values('date', ascending=False, kind='stable', ignore_index=True)
+
+def load_source_transactions():
+    """Load the bank export named by TRANSACTION_SOURCE, or generate sample data"""
+    source = os.environ.get('TRANSACTION_SOURCE')
+    if source:
+        from importer import load_transactions
+        return load_transactions(source)
+    return generate_transactions(150)
+
+# PDFs larger than this spill from memory to a temporary file
+PDF_SPOOL_SIZE = 8 * 1024 * 1024
+# Only statements up to this size are kept in the PDF cache
+PDF_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+def analyze_spending(df, aggregates=None, index=None):
     """Calculate comprehensive spending statistics"""
-    df['date'] = pd.to_datetime(df['date'])
+    # Any rollup with month and category totals works here, including the
+    # store's incrementally maintained RollupIndex
+    if aggregates is None:
+        aggregates = compute_aggregates(df)
+    if index is None:
+        index = DateIndex.from_frame(df)
     
     current_month = datetime.now().month
     current_year = datetime.now().year
+    this_month = month_key(current_year, current_month)
     
     # Current month data
-    this_month_df = df[(df['date'].dt.month == current_month) & (df['date'].dt.year == current_year)]
-    this_month_spending = this_month_df['amount'].sum()
+    this_month_spending = float(aggregates.month_totals.get(this_month, 0.0))
+    transactions_this_month = int(aggregates.month_counts.get(this_month, 0))
     
     # Previous month data
     prev_month = current_month - 1 if current_month > 1 else 12
     prev_year = current_year if current_month > 1 else current_year - 1
-    prev_month_df = df[(df['date'].dt.month == prev_month) & (df['date'].dt.year == prev_year)]
-    prev_month_spending = prev_month_df['amount'].sum()
+    prev_month_spending = float(aggregates.month_totals.get(month_key(prev_year, prev_month), 0.0))
     
     # Calculate daily average for current month
-    days_in_current_month = min(30, len(this_month_df))
+    days_in_current_month = min(30, transactions_this_month)
     daily_average = this_month_spending / days_in_current_month if days_in_current_month > 0 else 0
     
     # Statement period
     statement_start = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
     statement_end = datetime.now().strftime('%Y-%m-%d')
     
+    # Trailing 7/30/90-day spending up to today
+    rolling = index.rolling_totals(datetime.now())
+    
+    total_transactions = aggregates.transaction_count
+    average_transaction = aggregates.total_spent / total_transactions if total_transactions else 0
+    
     stats = {
-        'total_spent': round(df['amount'].sum(), 2),
-        'total_transactions': len(df),
-        'average_transaction': round(df['amount'].mean(), 2),
-        'largest_transaction': round(df['amount'].max(), 2),
-        'favorite_category': df['category'].mode().iloc[0] if not df['category'].mode().empty else 'N/A',
+        'total_spent': round(aggregates.total_spent, 2),
+        'total_transactions': total_transactions,
+        'average_transaction': round(average_transaction, 2),
+        'largest_transaction': round(aggregates.largest_transaction, 2),
+        'favorite_category': aggregates.favorite_category,
         'this_month_spending': round(this_month_spending, 2),
         'prev_month_spending': round(prev_month_spending, 2),
-        'transactions_this_month': len(this_month_df),
+        'transactions_this_month': transactions_this_month,
         'daily_average': round(daily_average, 2),
         'statement_period': f"{statement_start} to {statement_end}",
-        'spending_change': round(this_month_spending - prev_month_spending, 2)
+        'spending_change': round(this_month_spending - prev_month_spending, 2),
+        'rolling_spending': {f"{days}d": window['total'] for days, window in rolling.items()}
     }
     
     return stats
 
-def generate_ai_summary(stats, df):
+def generate_ai_summary(stats, df, aggregates=None, insights=None):
     """Generate AI-like spending summary with accurate insights"""
-    category_totals = df.groupby('category')['amount'].sum().sort_values(ascending=False)
+    if aggregates is None:
+        aggregates = compute_aggregates(df)
+    if insights is None:
+        insights = compute_insights(df)
+    
+    category_totals = aggregates.category_totals
     top_category = category_totals.index[0]
     top_category_amount = category_totals.iloc[0]
     
-    df['day_of_week'] = df['date'].dt.day_name()
-    daily_spending = df.groupby('day_of_week')['amount'].mean()
+    daily_spending = aggregates.weekday_means
     highest_day = daily_spending.idxmax()
     highest_day_amount = daily_spending.max()
     
@@ -637,12 +179,41 @@ def generate_ai_summary(stats, df):
     💡 **Budget Insight**: Consider allocating specific budgets for {top_category} and monitoring daily spending on {highest_day}s.
     """
     
+    projection = insights.projection
+    summary += f"""
+    🔮 **Month-End Projection**: At your current run rate of ${projection['daily_run_rate']:,.2f}/day you're on track to spend ${projection['projected_total']:,.2f} this month (${projection['month_to_date']:,.2f} so far, {projection['days_elapsed']} of {projection['days_in_month']} days).
+    """
+    
+    if not insights.category_trends.empty:
+        rising = insights.category_trends.index[0]
+        summary += f"""
+    📉 **Trends**: {rising} spending over the last 30 days is {abs(insights.category_trends.iloc[0]):.0f}% {'above' if insights.category_trends.iloc[0] > 0 else 'below'} its usual level.
+    """
+    
+    unusual = []
+    if not insights.anomalous_transactions.empty:
+        top = insights.anomalous_transactions.iloc[0]
+        unusual.append(f"{len(insights.anomalous_transactions)} transaction(s) stand out, the largest being ${top['amount']:,.2f} at {top['merchant']} on {top['date']} (typically ${top['typical_amount']:,.2f} for {top['category']})")
+    if not insights.anomalous_days.empty:
+        day = insights.anomalous_days.iloc[0]
+        unusual.append(f"{day['category']} spending on {day['date']} reached ${day['amount']:,.2f} against a 30-day baseline of ${day['baseline']:,.2f}/day")
+    if unusual:
+        summary += f"""
+    ⚠️ **Unusual Activity**: {'; '.join(unusual)}.
+    """
+    
     return summary.strip()
 
-def create_charts(df):
-    """Create accurate Plotly charts"""
+def create_charts(df, aggregates=None, output='html'):
+    """Create accurate Plotly charts as HTML fragments, or as JSON figure specs when output='json'"""
+    import plotly.express as px
+    import plotly.io as pio
+    
+    if aggregates is None:
+        aggregates = compute_aggregates(df)
+    
     # Spending by Category Pie Chart - Fixed
-    category_totals = df.groupby('category')['amount'].sum().reset_index()
+    category_totals = aggregates.category_totals.rename_axis('category').reset_index(name='amount')
     fig1 = px.pie(
         category_totals, 
         values='amount', 
@@ -660,31 +231,27 @@ def create_charts(df):
         uniformtext_mode='hide',
         showlegend=True
     )
-    category_chart = pio.to_html(fig1, full_html=False, div_id="categoryChart")
     
-    # Monthly Trend with accurate data
-    df['month_year'] = df['date'].dt.to_period('M').astype(str)
-    monthly_data = df.groupby('month_year')['amount'].sum().reset_index()
-    monthly_data = monthly_data.sort_values('month_year')
+    # Spending trend at a granularity suited to the history's length,
+    # downsampled so the figure stays small however much history there is
+    granularity, trend_dates, trend_amounts = trend_series(aggregates.daily_totals)
+    trend_data = pd.DataFrame({'period': trend_dates.astype(str), 'amount': trend_amounts})
     
     fig2 = px.line(
-        monthly_data, 
-        x='month_year', 
+        trend_data, 
+        x='period', 
         y='amount',
-        title='Monthly Spending Trend',
-        labels={'amount': 'Amount ($)', 'month_year': 'Month'},
+        title=f'{GRANULARITY_ADJECTIVES[granularity]} Spending Trend',
+        labels={'amount': 'Amount ($)', 'period': granularity.capitalize()},
         markers=True,
         line_shape='spline'
     )
     fig2.update_traces(
         hovertemplate='<b>%{x}</b><br>Total: $%{y:,.2f}'
     )
-    monthly_chart = pio.to_html(fig2, full_html=False, div_id="monthlyChart")
     
     # Daily Spending Pattern
-    df['day_of_week'] = df['date'].dt.day_name()
-    daily_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    daily_avg = df.groupby('day_of_week')['amount'].mean().reindex(daily_order).fillna(0)
+    daily_avg = aggregates.weekday_means.fillna(0)
     
     fig3 = px.bar(
         x=daily_avg.index, 
@@ -697,149 +264,583 @@ def create_charts(df):
     fig3.update_traces(
         hovertemplate='<b>%{x}</b><br>Average: $%{y:.2f}'
     )
-    daily_chart = pio.to_html(fig3, full_html=False, div_id="dailyChart")
     
-    return category_chart, monthly_chart, daily_chart
+    figures = [(fig1, "categoryChart"), (fig2, "monthlyChart"), (fig3, "dailyChart")]
+    if output == 'json':
+        return tuple(pio.to_json(fig) for fig, _ in figures)
+    # The page needs plotly.js once; the first fragment carries it for the others
+    return tuple(
+        pio.to_html(fig, full_html=False, div_id=div_id, include_plotlyjs=(i == 0))
+        for i, (fig, div_id) in enumerate(figures)
+    )
 
-def generate_monthly_statement(df):
-    """Generate comprehensive monthly statement data"""
-    current_month = datetime.now().month
-    current_year = datetime.now().year
+def cached_charts(version, df, output='html'):
+    """Charts for one snapshot of the data, rendered once per dataset version"""
+    return chart_cache.get_or_set(
+        (version, output),
+        lambda: create_charts(df, derived_for(version, df, 'aggregates', compute_aggregates), output)
+    )
+
+def generate_monthly_statement(df, aggregates=None, index=None, month=None):
+    """Generate comprehensive monthly statement data for the current month, or for month ('YYYY-MM')"""
+    if index is None:
+        index = DateIndex.from_frame(df)
+    if month is None:
+        month_start = pd.Timestamp(datetime.now().date()).replace(day=1)
+    else:
+        month_start = pd.Timestamp(f"{month}-01")
+    month_end = month_start + pd.offsets.MonthBegin(1)
     
-    # Filter current month transactions
-    monthly_df = df[(df['date'].dt.month == current_month) & (df['date'].dt.year == current_year)]
+    # The month's transactions, located by binary search over the date index
+    monthly_df = df.iloc[index.positions_between(month_start, month_end)]
     
-    if monthly_df.empty:
+    if monthly_df.empty and month is None:
         # Use last available month if current month has no data
-        monthly_df = df[df['date'] == df['date'].max()]
+        monthly_df = df.iloc[index.positions_between(index.last_date)]
+        aggregates = None
     
-    category_totals = monthly_df.groupby('category')['amount'].sum().sort_values(ascending=False)
+    if monthly_df.empty:
+        # A month without transactions (or no data at all) gets an empty statement rather than an error
+        return {
+            'current_month_spending': 0,
+            'transactions_this_month': 0,
+            'daily_average': 0,
+            'statement_period': f"{month_start.strftime('%Y-%m-%d')} to {(month_end - pd.Timedelta(days=1)).strftime('%Y-%m-%d')}",
+            'top_category': 'N/A',
+            'top_category_amount': 0
+        }, monthly_df
+    
+    if aggregates is None:
+        aggregates = compute_aggregates(monthly_df)
+    
+    month = month_key(monthly_df['date'].iloc[0].year, monthly_df['date'].iloc[0].month)
+    month_spending = float(aggregates.month_totals[month])
+    category_totals = aggregates.month_category_totals.loc[month]
+    category_totals = category_totals[category_totals > 0].sort_values(ascending=False, kind='stable')
     
     statement_summary = {
-        'current_month_spending': round(monthly_df['amount'].sum(), 2),
+        'current_month_spending': round(month_spending, 2),
         'transactions_this_month': len(monthly_df),
-        'daily_average': round(monthly_df['amount'].sum() / len(monthly_df['date'].dt.day.unique()), 2),
+        'daily_average': round(month_spending / int(aggregates.month_active_days[month]), 2),
         'statement_period': f"{monthly_df['date'].min().strftime('%Y-%m-%d')} to {monthly_df['date'].max().strftime('%Y-%m-%d')}",
         'top_category': category_totals.index[0] if not category_totals.empty else 'N/A',
-        'top_category_amount': round(category_totals.iloc[0], 2) if not category_totals.empty else 0
+        'top_category_amount': round(float(category_totals.iloc[0]), 2) if not category_totals.empty else 0
     }
     
     return statement_summary, monthly_df
 
-@app.route('/')
+def summarize_period(df, start, end, index=None):
+    """Statement-style summary of the transactions in [start, end); returns (summary, period_df)"""
+    if index is None:
+        index = DateIndex.from_frame(df)
+    period_df = df.iloc[index.positions_between(start, end)]
+    total = index.total(start, end)
+    active_days = period_df['date'].dt.normalize().nunique()
+    category_totals = period_df.groupby('category', observed=True)['amount'].sum()
+    category_totals = category_totals[category_totals > 0].sort_values(ascending=False, kind='stable')
+    
+    summary = {
+        'statement_period': f"{pd.Timestamp(start).strftime('%Y-%m-%d')} to {(pd.Timestamp(end) - pd.Timedelta(days=1)).strftime('%Y-%m-%d')}",
+        'total_spent': round(total, 2),
+        'transaction_count': len(period_df),
+        'daily_average': round(total / active_days, 2) if active_days else 0,
+        'category_totals': {category: round(float(amount), 2) for category, amount in category_totals.items()}
+    }
+    return summary, period_df
+
+def derived_for(version, df, name, builder):
+    """store.derived(name, builder) for a snapshot, built from df itself once a newer version is current"""
+    value = store.derived(name, builder)
+    return value if store.version == version else builder(df)
+
+def date_index(version, df):
+    """DateIndex for a snapshot, shared through the store while that version is current"""
+    return derived_for(version, df, 'date_index', DateIndex.from_frame)
+
+def build_dashboard():
+    """Compute everything the dashboard shows for the current data; returns (version, payload)"""
+    version, df = store.snapshot()
+    metrics.set_gauge('spending_transactions_rows', len(df))
+    # Every field comes from this one snapshot, so the fingerprint always
+    # describes the stats and charts it is sent with. Computing it here also
+    # warms it for conditional requests
+    fingerprint = derived_for(version, df, 'fingerprint', dataset_fingerprint)
+    aggregates = derived_for(version, df, 'aggregates', compute_aggregates)
+    rollups, recent = store.rollups(), store.recent(15)
+    if store.version != version:
+        # Data changed since the snapshot: its rollups and recent rows are no longer the store's
+        rollups, recent = aggregates, df.head(15).to_dict('records')
+    stats = analyze_spending(df, rollups, date_index(version, df))
+    insights = derived_for(version, df, 'insights', compute_insights)
+    category_chart, monthly_chart, daily_chart = cached_charts(version, df)
+    # Figure specs let live dashboards redraw charts with Plotly.react
+    chart_specs = dict(zip(('categoryChart', 'monthlyChart', 'dailyChart'), cached_charts(version, df, 'json')))
+    
+    return version, {
+        'fingerprint': fingerprint,
+        'stats': stats,
+        'ai_summary': generate_ai_summary(stats, df, aggregates, insights),
+        'category_chart': category_chart,
+        'monthly_chart': monthly_chart,
+        'daily_chart': daily_chart,
+        'chart_specs': chart_specs,
+        'recent_transactions': recent
+    }
+
+@bp.route('/')
+@conditional(store)
 def index():
     """Main page route"""
-    df = generate_transactions(150)
-    stats = analyze_spending(df)
-    ai_summary = generate_ai_summary(stats, df)
-    category_chart, monthly_chart, daily_chart = create_charts(df)
-    recent_transactions = df.head(15).to_dict('records')
-    
-    return render_template(
-        'index.html',
-        stats=stats,
-        ai_summary=ai_summary,
-        category_chart=category_chart,
-        monthly_chart=monthly_chart,
-        daily_chart=daily_chart,
-        recent_transactions=recent_transactions
-    )
-
-@app.route('/refresh')
+    with stage('load'):
+        store.get()
+    with stage('payload'):
+        payload = dashboard.get(store.version)
+    
+    with stage('render'):
+        return render_template('index.html', **payload)
+
+@bp.route('/events')
+def events():
+    """Server-sent events carrying what changed on the dashboard whenever the data changes"""
+    # Make sure there is a payload for new subscribers to compare against
+    with stage('payload'):
+        store.get()
+        dashboard.get(store.version)
+    since = request.headers.get('Last-Event-ID') or request.args.get('since')
+    # The stream's close callback runs outside the app context, so hold the object itself rather than a proxy
+    updates = current_app.extensions['live_updates']
+    subscriber = updates.subscribe(since)
+    if subscriber is None:
+        # Every open stream holds a server thread, so refuse more than MAX_EVENT_STREAMS
+        return jsonify({'error': 'Too many open event streams'}), 503, {'Retry-After': '30'}
+    response = Response(updates.stream(subscriber), mimetype='text/event-stream')
+    # Also frees the slot of a client that disconnects before the stream starts
+    response.call_on_close(lambda: updates.unsubscribe(subscriber))
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@bp.route('/refresh')
 def refresh_data():
     """API endpoint to refresh data"""
-    df = generate_transactions(150)
-    stats = analyze_spending(df)
-    ai_summary = generate_ai_summary(stats, df)
-    recent_transactions = df.head(15).to_dict('records')
-    
-    return jsonify({
-        'stats': stats,
-        'ai_summary': ai_summary,
-        'recent_transactions': recent_transactions
-    })
+    with stage('load'):
+        store.refresh()
+    with stage('payload'):
+        payload = dashboard.get(store.version)
+    
+    with stage('serialize'):
+        return jsonify({
+            'stats': payload['stats'],
+            'ai_summary': payload['ai_summary'],
+            'recent_transactions': payload['recent_transactions']
+        })
 
-@app.route('/generate_statement')
+@bp.route('/generate_statement')
+@conditional(store)
 def generate_statement():
     """API endpoint to generate monthly statement"""
-    df = generate_transactions(150)
-    statement_summary, monthly_df = generate_monthly_statement(df)
-    
-    return jsonify({
-        'statement_summary': statement_summary,
-        'monthly_transactions': monthly_df.head(20).to_dict('records')
-    })
+    with stage('load'):
+        version, df = store.snapshot()
+    with stage('aggregate'):
+        aggregates = derived_for(version, df, 'aggregates', compute_aggregates)
+        index = date_index(version, df)
+    with stage('statement'):
+        statement_summary, monthly_df = generate_monthly_statement(df, aggregates, index)
+    
+    with stage('serialize'):
+        return jsonify({
+            'statement_summary': statement_summary,
+            'monthly_transactions': monthly_df.head(20).to_dict('records')
+        })
 
-@app.route('/download_statement')
+@bp.route('/download_statement')
 def download_statement():
-    """Download PDF monthly statement"""
-    df = generate_transactions(150)
-    statement_summary, monthly_df = generate_monthly_statement(df)
-    
-    # Create PDF
-    buffer = io.BytesIO()
-    p = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
-    
-    # Header
-    p.setFont("Helvetica-Bold", 16)
-    p.drawString(100, height - 100, "Monthly Bank Statement")
-    p.setFont("Helvetica", 12)
-    p.drawString(100, height - 130, f"Statement Period: {statement_summary['statement_period']}")
-    
-    # Summary
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(100, height - 180, "Summary")
-    p.setFont("Helvetica", 12)
-    
-    y_position = height - 210
-    summaries = [
-        f"Total Spending: ${statement_summary['current_month_spending']:.2f}",
-        f"Number of Transactions: {statement_summary['transactions_this_month']}",
-        f"Daily Average: ${statement_summary['daily_average']:.2f}",
-        f"Top Category: {statement_summary['top_category']} (${statement_summary['top_category_amount']:.2f})"
-    ]
-    
-    for summary in summaries:
-        p.drawString(120, y_position, summary)
-        y_position -= 25
-    
-    # Transactions
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(100, y_position - 30, "Recent Transactions")
-    p.setFont("Helvetica", 10)
-    
-    y_position -= 60
-    for _, transaction in monthly_df.head(15).iterrows():
-        if y_position < 100:
-            p.showPage()
-            p.setFont("Helvetica", 10)
-            y_position = height - 100
-        
-        p.drawString(120, y_position, 
-                    f"{transaction['date'].strftime('%Y-%m-%d')} - {transaction['merchant']} - "
-                    f"{transaction['category']} - ${transaction['amount']:.2f}")
-        y_position -= 20
-    
-    p.save()
-    buffer.seek(0)
-    
+    """Download PDF monthly statement, reusing the rendered PDF while the data is unchanged"""
+    with stage('load'):
+        store.get()
+        key = (store.derived('fingerprint', dataset_fingerprint), datetime.now().strftime('%Y%m'))
+    
+    cached = pdf_cache.get(key)
+    if cached is None:
+        output = render_statement()
+        size = output.seek(0, os.SEEK_END)
+        output.seek(0)
+        if size > PDF_CACHE_MAX_BYTES:
+            # Too big to keep in memory: stream it from the spool file as before
+            return send_statement(output)
+        body = output.read()
+        cached = (hashlib.sha256(body).hexdigest(), body)
+        pdf_cache.put(key, cached)
+    
+    content_hash, body = cached
+    return send_statement(io.BytesIO(body), etag=content_hash)
+
+def render_statement():
+    """Render the current month's PDF statement into a spooled temporary file"""
+    from statements import render_statement_pdf
+    
+    version, df = store.snapshot()
+    with stage('aggregate'):
+        aggregates = derived_for(version, df, 'aggregates', compute_aggregates)
+        index = date_index(version, df)
+    with stage('statement'):
+        statement_summary, monthly_df = generate_monthly_statement(df, aggregates, index)
+    
+    # Spool the PDF to a temporary file and stream it from there
+    with stage('pdf'):
+        output = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_SIZE)
+        render_statement_pdf(statement_summary, monthly_df, output)
+    return output
+
+def send_statement(output, etag=False):
+    """Send a PDF statement as an attachment; with an etag, conditional requests can get a 304"""
     return send_file(
-        buffer,
+        output,
         as_attachment=True,
         download_name=f"monthly_statement_{datetime.now().strftime('%Y%m')}.pdf",
-        mimetype='application/pdf'
+        mimetype='application/pdf',
+        etag=etag
     )
 
-@app.route('/api/transactions')
+@bp.route('/api/statements/batch')
+@conditional(store)
+def batch_statements():
+    """Zip of PDF statements for every month with transactions, or for ?months=YYYY-MM,..."""
+    with stage('load'):
+        df = store.get()
+    months = [month for month in request.args.get('months', '').split(',') if month] or None
+    # Rendered on the app's process pool and streamed out as each statement completes
+    response = Response(
+        zip_stream(frame_statements(df, current_app.extensions['statement_pool'], months)),
+        mimetype='application/zip'
+    )
+    response.headers['Content-Disposition'] = 'attachment; filename=statements.zip'
+    return response
+
+@bp.route('/api/charts')
+@conditional(store)
+def get_charts():
+    """API endpoint to get chart figure specs for client-side rendering"""
+    with stage('charts'):
+        version, df = store.snapshot()
+        category_chart, monthly_chart, daily_chart = cached_charts(version, df, 'json')
+    body = f'{{"category_chart": {category_chart}, "monthly_chart": {monthly_chart}, "daily_chart": {daily_chart}}}'
+    return Response(body, mimetype='application/json')
+
+# Rows serialized per chunk when streaming transactions
+STREAM_CHUNK_SIZE = 5000
+MAX_PAGE_SIZE = 10000
+
+def encode_cursor(fingerprint, position):
+    """Opaque pagination cursor pointing at a row of one dataset.
+
+    Keyed on the dataset fingerprint rather than the store version, which
+    is per process, so any worker holding the same data accepts it.
+    """
+    return base64.urlsafe_b64encode(f"{fingerprint}:{position}".encode()).decode()
+
+def decode_cursor(cursor):
+    """Return (fingerprint, position) for a cursor made by encode_cursor"""
+    fingerprint, position = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+    return fingerprint, int(position)
+
+def filter_transactions(df, start=None, end=None, category=None, index=None):
+    """Return positions of rows inside an inclusive date range and category"""
+    if index is None:
+        index = DateIndex.from_frame(df)
+    if start or end:
+        # Binary search for the date range, then only check the rows inside it
+        positions = index.positions_between(
+            pd.Timestamp(start) if start else None,
+            pd.Timestamp(end) + pd.Timedelta(days=1) if end else None
+        )
+    else:
+        positions = np.arange(len(df))
+    if category:
+        positions = positions[(df['category'].to_numpy()[positions] == category)]
+    return positions
+
+def transactions_json(chunk, lines=False):
+    """Serialize a chunk of transactions as JSON records, or NDJSON when lines=True"""
+    rows = pd.DataFrame({
+        'date': chunk['date'].dt.strftime('%a, %d %b %Y %H:%M:%S GMT'),
+        'amount': chunk['amount'],
+        'merchant': chunk['merchant'].astype(str),
+        'category': chunk['category'].astype(str)
+    })
+    return rows.to_json(orient='records', lines=lines)
+
+def stream_transactions(df, positions, ndjson=False):
+    """Yield transactions chunk by chunk as NDJSON lines or as one JSON array"""
+    if not ndjson:
+        yield '['
+    for i in range(0, len(positions), STREAM_CHUNK_SIZE):
+        chunk = transactions_json(df.iloc[positions[i:i + STREAM_CHUNK_SIZE]], lines=ndjson)
+        if ndjson:
+            yield chunk if chunk.endswith('\n') else chunk + '\n'
+        else:
+            yield (',' if i else '') + chunk[1:-1]
+    if not ndjson:
+        yield ']'
+
+def transactions_response(version, df, args):
+    """Build the /api/transactions response for one dataset version and query"""
+    try:
+        with stage('filter'):
+            positions = filter_transactions(
+                df,
+                start=args.get('start'),
+                end=args.get('end'),
+                category=args.get('category'),
+                index=date_index(version, df) if args.get('start') or args.get('end') else None
+            )
+    except ValueError:
+        return jsonify({'error': 'start and end must be dates (YYYY-MM-DD)'}), 400
+    ndjson = args.get('format') == 'ndjson'
+    limit = args.get('limit', type=int)
+    if 'limit' in args and (limit is None or limit < 1):
+        return jsonify({'error': 'limit must be a positive whole number'}), 400
+    cursor = args.get('cursor')
+    
+    if limit is None and cursor is None:
+        # Full export, written in chunks rather than built in memory
+        return Response(
+            stream_transactions(df, positions, ndjson),
+            mimetype='application/x-ndjson' if ndjson else 'application/json'
+        )
+    
+    fingerprint = derived_for(version, df, 'fingerprint', dataset_fingerprint)
+    position = 0
+    if cursor:
+        try:
+            cursor_fingerprint, position = decode_cursor(cursor)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        if cursor_fingerprint != fingerprint:
+            return jsonify({'error': 'Cursor refers to data that has since been refreshed'}), 410
+    
+    limit = min(limit or MAX_PAGE_SIZE, MAX_PAGE_SIZE)
+    first = np.searchsorted(positions, position)
+    page = positions[first:first + limit]
+    next_cursor = encode_cursor(fingerprint, int(positions[first + limit])) if first + limit < len(positions) else None
+    
+    if ndjson:
+        response = Response(stream_transactions(df, page, ndjson=True), mimetype='application/x-ndjson')
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+    
+    body = f'{{"transactions": {transactions_json(df.iloc[page])}, "next_cursor": {json.dumps(next_cursor)}}}'
+    return Response(body, mimetype='application/json')
+
+@bp.route('/api/transactions')
+@conditional(store)
 def get_transactions():
-    """API endpoint to get all transactions"""
-    df = generate_transactions(150)
-    return jsonify(df.to_dict('records'))
+    """API endpoint to get transactions, optionally filtered, paginated or streamed as NDJSON"""
+    with stage('load'):
+        version, df = store.snapshot()
+    return transactions_response(version, df, request.args)
+
+@bp.route('/api/window')
+@conditional(store)
+def get_window():
+    """API endpoint to summarize any date window (inclusive YYYY-MM-DD start and end)"""
+    with stage('load'):
+        version, df = store.snapshot()
+        index = date_index(version, df)
+    try:
+        end = pd.Timestamp(request.args['end']) if 'end' in request.args else index.last_date or pd.Timestamp.now()
+        start = pd.Timestamp(request.args['start']) if 'start' in request.args else end - pd.Timedelta(days=29)
+    except ValueError:
+        return jsonify({'error': 'start and end must be dates (YYYY-MM-DD)'}), 400
+    
+    with stage('window'):
+        summary, period_df = summarize_period(df, day_start(start), day_start(end) + np.timedelta64(1, 'D'), index)
+    with stage('serialize'):
+        return jsonify({
+            'summary': summary,
+            'transactions': period_df.head(20).to_dict('records')
+        })
+
+@bp.route('/api/rolling')
+@conditional(store)
+def get_rolling():
+    """API endpoint for trailing spending totals, e.g. ?windows=7,30,90&end=YYYY-MM-DD"""
+    with stage('load'):
+        version, df = store.snapshot()
+        index = date_index(version, df)
+    try:
+        windows = [int(days) for days in request.args.get('windows', '').split(',') if days] or ROLLING_WINDOWS
+        end = pd.Timestamp(request.args['end']) if 'end' in request.args else None
+    except ValueError:
+        return jsonify({'error': 'windows must be whole days and end a date (YYYY-MM-DD)'}), 400
+    if min(windows) < 1:
+        return jsonify({'error': 'windows must be positive whole days'}), 400
+    
+    with stage('window'):
+        totals = index.rolling_totals(end, windows)
+    return jsonify({
+        'end': (end or index.last_date or pd.Timestamp.now()).strftime('%Y-%m-%d'),
+        'windows': {f"{days}d": window for days, window in totals.items()}
+    })
+
+@bp.route('/api/insights')
+@conditional(store)
+def get_insights():
+    """API endpoint for spending anomalies, category trends and the month-end projection"""
+    with stage('insights'):
+        insights = store.derived('insights', compute_insights)
+    return jsonify(insights.to_dict())
+
+@bp.route('/api/trend')
+@conditional(store)
+def get_trend():
+    """API endpoint for the spending trend over a range, e.g. ?start=YYYY-MM-DD&end=YYYY-MM-DD&granularity=week"""
+    with stage('aggregate'):
+        aggregates = store.derived('aggregates', compute_aggregates)
+    granularity = request.args.get('granularity')
+    if granularity is not None and granularity not in GRANULARITIES:
+        return jsonify({'error': f"granularity must be one of {', '.join(GRANULARITIES)}"}), 400
+    try:
+        max_points = min(max(request.args.get('max_points', MAX_POINTS, type=int), 3), MAX_POINTS)
+        granularity, dates, amounts = trend_series(
+            aggregates.daily_totals,
+            start=request.args.get('start'),
+            end=request.args.get('end'),
+            granularity=granularity,
+            max_points=max_points
+        )
+    except ValueError:
+        return jsonify({'error': 'start and end must be dates (YYYY-MM-DD)'}), 400
+    
+    return jsonify({
+        'granularity': granularity,
+        'points': [{'date': str(date), 'amount': round(float(amount), 2)} for date, amount in zip(dates, amounts)]
+    })
+
+@bp.route('/api/cube')
+@conditional(store)
+def get_cube():
+    """API endpoint for drilldowns, e.g. ?group_by=merchant,month&category=Travel&weekday=Saturday&limit=20
+
+    Dimensions are category, merchant, month (YYYY-MM) and weekday; a
+    dimension may be repeated to keep several values. An empty group_by
+    gives the grand total of the matching transactions.
+    """
+    with stage('aggregate'):
+        cube = store.derived('cube', AggregateCube.from_frame)
+    group_by = list(dict.fromkeys(dimension for dimension in request.args.get('group_by', 'category').split(',') if dimension))
+    filters = {dimension: request.args.getlist(dimension) for dimension in DIMENSIONS if dimension in request.args}
+    limit = request.args.get('limit', type=int)
+    if 'limit' in request.args and (limit is None or limit < 1):
+        return jsonify({'error': 'limit must be a positive whole number'}), 400
+    try:
+        with stage('query'):
+            result = cube.query(group_by, filters, limit=limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    with stage('serialize'):
+        return jsonify({
+            'group_by': group_by,
+            'filters': filters,
+            'rows': result.to_dict('records')
+        })
+
+@bp.route('/api/budgets')
+def get_budgets():
+    """API endpoint listing every monthly budget with its month-to-date spending"""
+    month, statuses, _ = budget_monitor.current()
+    return jsonify({'month': month, 'budgets': statuses})
+
+@bp.route('/api/budgets/alerts')
+def get_budget_alerts():
+    """API endpoint for budgets that are over or near their monthly limit"""
+    month, _, alerts = budget_monitor.current()
+    return jsonify({'month': month, 'alerts': alerts})
+
+@bp.route('/api/budgets/<path:category>', methods=['PUT', 'DELETE'])
+def update_budget(category):
+    """Set a category's monthly budget with PUT {"limit": 500}, or remove it with DELETE"""
+    limit = None
+    if request.method == 'PUT':
+        limit = (request.get_json(silent=True) or {}).get('limit')
+        if isinstance(limit, bool) or not isinstance(limit, (int, float)) or limit <= 0:
+            return jsonify({'error': 'limit must be a positive number'}), 400
+    store.set_budget(category, limit)
+    budget_monitor.check()
+    return get_budgets()
+
+@bp.route('/metrics')
+def get_metrics():
+    """Prometheus metrics endpoint"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def create_app(config=None, transaction_store=None):
+    """Create the Flask application and its shared transaction store"""
+    app = Flask(__name__)
+    app.config['PROFILING'] = os.environ.get('ENABLE_PROFILING') == '1'
+    app.config['PROFILE_DIR'] = os.environ.get('PROFILE_DIR')
+    app.config['CHART_CACHE_SIZE'] = int(os.environ.get('CHART_CACHE_SIZE', 32))
+    app.config['ASYNC_WORKERS'] = int(os.environ.get('ASYNC_WORKERS', 4))
+    app.config['PRECOMPUTE_DELAY'] = float(os.environ.get('PRECOMPUTE_DELAY', 0.1))
+    app.config['PDF_CACHE_SIZE'] = int(os.environ.get('PDF_CACHE_SIZE', 4))
+    app.config['ETAG_SALT'] = os.environ.get('ETAG_SALT', '')
+    app.config['STATEMENT_WORKERS'] = int(os.environ.get('STATEMENT_WORKERS', 0)) or None
+    app.config['BUDGET_NEAR_LIMIT'] = float(os.environ.get('BUDGET_NEAR_LIMIT', 0.8))
+    app.config['MAX_EVENT_STREAMS'] = int(os.environ.get('MAX_EVENT_STREAMS', MAX_SUBSCRIBERS))
+    if config:
+        app.config.update(config)
+    
+    # Transactions are loaded once per process and shared by every route
+    if transaction_store is None:
+        transaction_store = create_store(
+            os.environ.get('TRANSACTION_STORE', 'memory'),
+            loader=load_source_transactions,
+            path=os.environ.get('TRANSACTION_DB'),
+            compact=os.environ.get('TRANSACTION_COMPACT') == '1'
+        )
+    app.extensions['transaction_store'] = transaction_store
+    # Pick up changes other worker processes made to a shared backend
+    app.before_request(transaction_store.check_for_updates)
+    # Rendered charts keyed by (dataset version, output format)
+    app.extensions['chart_cache'] = LRUCache(max_entries=app.config['CHART_CACHE_SIZE'])
+    app.extensions['metrics'] = Metrics()
+    # Rendered PDF statements keyed by (data fingerprint, month), with their content hash
+    app.extensions['pdf_cache'] = LRUCache(max_entries=app.config['PDF_CACHE_SIZE'])
+    # One bounded pool renders batch statements for every request
+    app.extensions['statement_pool'] = statement_pool(app.config['STATEMENT_WORKERS'])
+    
+    def build_in_app_context():
+        with app.app_context():
+            return build_dashboard()
+    
+    # Dashboard payloads are rebuilt in the background whenever the data changes
+    app.extensions['dashboard'] = DashboardPrecomputer(
+        build_in_app_context,
+        current_version=lambda: transaction_store.version,
+        delay=app.config['PRECOMPUTE_DELAY']
+    )
+    transaction_store.subscribe(app.extensions['dashboard'].schedule)
+    # Each rebuilt payload is diffed once and pushed to every open /events stream
+    app.extensions['live_updates'] = LiveUpdates(max_subscribers=app.config['MAX_EVENT_STREAMS'])
+    app.extensions['dashboard'].subscribe(app.extensions['live_updates'].publish)
+    # Budgets are checked against the running totals on every change
+    app.extensions['budget_monitor'] = BudgetMonitor(transaction_store, near=app.config['BUDGET_NEAR_LIMIT'])
+    transaction_store.subscribe(app.extensions['budget_monitor'].check)
+    
+    init_metrics(app, app.extensions['metrics'])
+    init_http_cache(app)
+    app.register_blueprint(bp)
+    
+    import async_api
+    async_api.init_app(app)
+    return app
 
 if __name__ == '__main__':
     print("🚀 Starting AI Spending Analyzer...")
     print("📊 Open http://localhost:5000 in your browser")
     print("📈 Features: Fixed pie chart, accurate spending history, monthly statements")
     print("💾 Buttons: Refresh Data, Generate Statement, Download PDF")
+    app = create_app()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,74 @@
+# date_index.py
+import numpy as np
+import pandas as pd
+
+# Trailing windows reported by rolling_totals(), in days
+ROLLING_WINDOWS = (7, 30, 90)
+
+def day_start(value):
+    """Midnight of the day a date-like value falls on, as datetime64[ns]"""
+    return np.datetime64(pd.Timestamp(value).normalize(), 'ns')
+
+class DateIndex:
+    """Transactions ordered by date with running totals, for window queries in O(log N + k).
+
+    Windows are half-open, [start, end). Their bounds come from a binary
+    search over the sorted dates and their totals from prefix sums, so only
+    the k rows inside a window are ever touched.
+    """
+
+    def __init__(self, dates, positions, cumulative):
+        self.dates = dates
+        self.positions = positions
+        self.cumulative = cumulative
+
+    @classmethod
+    def from_frame(cls, df):
+        """Index a transactions frame; positions refer to its rows"""
+        dates = df['date'].to_numpy(dtype='datetime64[ns]')
+        positions = np.argsort(dates, kind='stable')
+        amounts = df['amount'].to_numpy(dtype=float)[positions]
+        return cls(dates[positions], positions, np.concatenate(([0.0], np.cumsum(amounts))))
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def first_date(self):
+        return pd.Timestamp(self.dates[0]) if len(self) else None
+
+    @property
+    def last_date(self):
+        return pd.Timestamp(self.dates[-1]) if len(self) else None
+
+    def bounds(self, start=None, end=None):
+        """Range of sorted entries inside [start, end); None leaves that side open"""
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start), 'ns'), 'left'))
+        hi = len(self) if end is None else int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end), 'ns'), 'left'))
+        return lo, max(lo, hi)
+
+    def positions_between(self, start=None, end=None):
+        """Frame positions of the rows inside [start, end), in frame order"""
+        lo, hi = self.bounds(start, end)
+        return np.sort(self.positions[lo:hi])
+
+    def total(self, start=None, end=None):
+        """Spending inside [start, end)"""
+        lo, hi = self.bounds(start, end)
+        return float(self.cumulative[hi] - self.cumulative[lo])
+
+    def count(self, start=None, end=None):
+        """Number of transactions inside [start, end)"""
+        lo, hi = self.bounds(start, end)
+        return hi - lo
+
+    def rolling_totals(self, end=None, windows=ROLLING_WINDOWS):
+        """Spending and counts over trailing windows of days, ending with the day `end` (default: the latest transaction)"""
+        if end is None:
+            end = self.last_date if len(self) else pd.Timestamp.now()
+        stop = day_start(end) + np.timedelta64(1, 'D')
+        totals = {}
+        for days in windows:
+            start = stop - np.timedelta64(days, 'D')
+            totals[days] = {'total': round(self.total(start, stop), 2), 'count': self.count(start, stop)}
+        return totals
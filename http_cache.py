@@ -0,0 +1,141 @@
+# http_cache.py
+import gzip
+import hashlib
+import inspect
+import zlib
+from datetime import date, datetime, time, timezone
+from functools import wraps
+
+import pandas as pd
+from flask import current_app, make_response, request
+from werkzeug.http import is_resource_modified
+
+from cache import LRUCache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Only text responses at least this large are worth compressing
+COMPRESSIBLE_TYPES = ('text/html', 'text/plain', 'application/json', 'application/x-ndjson')
+MIN_COMPRESS_SIZE = 500
+
+def dataset_fingerprint(df):
+    """Content hash of a transactions frame, identical across worker processes"""
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha1(hashes.tobytes()).hexdigest()[:16]
+
+def dataset_etag(store):
+    """ETag for the current request: the data's fingerprint plus the full path and query"""
+    fingerprint = store.derived('fingerprint', dataset_fingerprint)
+    salt = current_app.config.get('ETAG_SALT', '')
+    # The statement covers the current month, so responses also change with the date
+    resource = hashlib.sha1(f"{salt}{date.today()}{request.full_path}".encode()).hexdigest()[:8]
+    return f"{fingerprint}-{resource}"
+
+def last_modified(store):
+    """Last-Modified for data routes: the later of the data's last change and local midnight, in UTC.
+
+    Responses also change with the date (the statement covers the current
+    month), so If-Modified-Since alone must not get a 304 across midnight.
+    """
+    midnight = datetime.combine(date.today(), time()).astimezone(timezone.utc)
+    return max(store.updated_at, midnight) if store.updated_at else midnight
+
+def conditional(store):
+    """Decorate a view so it answers If-None-Match/If-Modified-Since with 304 before doing any work"""
+    def decorator(view):
+        def not_modified(etag):
+            return not is_resource_modified(request.environ, etag=etag, last_modified=last_modified(store))
+
+        def validators(response, etag):
+            response = make_response(response)
+            if response.status_code == 200:
+                response.set_etag(etag, weak=True)
+                response.last_modified = last_modified(store)
+                response.cache_control.no_cache = True
+            return response
+
+        def short_circuit(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+
+        if inspect.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(*args, **kwargs):
+                etag = dataset_etag(store)
+                if not_modified(etag):
+                    return short_circuit(etag)
+                return validators(await view(*args, **kwargs), etag)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = dataset_etag(store)
+            if not_modified(etag):
+                return short_circuit(etag)
+            return validators(view(*args, **kwargs), etag)
+        return wrapper
+    return decorator
+
+def choose_encoding(accept_encoding, streamed):
+    """Best content coding the client accepts: br for buffered bodies when available, else gzip"""
+    if brotli is not None and not streamed and accept_encoding['br']:
+        return 'br'
+    if accept_encoding['gzip']:
+        return 'gzip'
+    return None
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+def gzip_stream(chunks):
+    """Gzip a streamed body chunk by chunk"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def init_app(app):
+    """Compress text responses, reusing compressed bodies of responses that carry an ETag"""
+    compressed_bodies = LRUCache(max_entries=app.config.get('COMPRESSED_CACHE_SIZE', 32))
+    app.extensions['compressed_bodies'] = compressed_bodies
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.accept_encodings, response.is_streamed)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = gzip_stream(response.response)
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < MIN_COMPRESS_SIZE:
+                return response
+            etag, _ = response.get_etag()
+            if etag:
+                # Same data, same bytes: compress once per ETag and encoding
+                body = compressed_bodies.get_or_set((etag, encoding), lambda: compress(body, encoding))
+            else:
+                body = compress(body, encoding)
+            response.set_data(body)
+
+        response.headers['Content-Encoding'] = encoding
+        return response
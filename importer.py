@@ -0,0 +1,210 @@
+# importer.py
+"""Bulk import of exported bank transactions (CSV, or Parquet when pyarrow is installed).
+
+    python importer.py statement.csv --db transactions.db
+    python importer.py statement.csv --rules my_rules.json
+"""
+import argparse
+import os
+
+import pandas as pd
+
+from categories import OTHER_CATEGORY, normalize_category
+from categorizer import Categorizer, default_categorizer, default_rules, load_rules
+from rollups import RollupIndex
+
+# Rows read per chunk, so files larger than memory can be imported
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Header names used by common bank exports for each column we need
+COLUMN_ALIASES = {
+    'date': ['date', 'transaction date', 'posted date', 'posting date', 'trans date', 'booking date'],
+    'amount': ['amount', 'debit', 'debit amount', 'withdrawal', 'withdrawals', 'value'],
+    'merchant': ['merchant', 'description', 'payee', 'name', 'details', 'memo'],
+    'category': ['category', 'transaction category']
+}
+
+def empty_transactions():
+    """Transactions frame with no rows and the analysis schema"""
+    return pd.DataFrame({
+        'date': pd.Series(dtype='datetime64[ns]'),
+        'amount': pd.Series(dtype='float64'),
+        'merchant': pd.Series(dtype='category'),
+        'category': pd.Series(dtype='category')
+    })
+
+def resolve_columns(header):
+    """Map our column names onto the file's header names"""
+    lookup = {name.strip().lower(): name for name in header}
+    columns = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in lookup:
+                columns[column] = lookup[alias]
+                break
+
+    missing = {'date', 'amount', 'merchant'} - set(columns)
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(sorted(missing))}")
+    return columns
+
+# Card processors that put their own name before the merchant's, as in "SQ *BLUE BOTTLE COFFEE"
+PAYMENT_PROCESSORS = ['sq', 'tst', 'paypal', 'pp', 'sp', 'py', 'pos', 'google', 'ckc', 'in', 'bt', 'fs', 'dd', 'ls']
+
+def normalize_merchants(merchants):
+    """Clean merchant strings: drop processor prefixes, reference codes and store numbers, tidy case and spacing"""
+    unique = pd.Series(merchants.dropna().unique(), dtype='string')
+    processors = '|'.join(PAYMENT_PROCESSORS)
+    cleaned = (
+        unique.str.replace(rf'(?i)^\s*(?:{processors})\s*\*\s*', '', regex=True)
+        # A trailing reference is the last word after '*' or '#' when it contains a digit
+        .str.replace(r'\s*[*#]\s*[^\s*#]*\d[^\s*#]*\s*$', '', regex=True)
+        .str.replace(r'[*#]', ' ', regex=True)
+        .str.replace(r'\s+\d{3,}\b.*$', '', regex=True)
+        .str.replace(r'\s+', ' ', regex=True)
+        .str.strip()
+        .str.title()
+    )
+    cleaned = cleaned.where(cleaned.str.len() > 0, unique.str.strip())
+    # Clean each distinct merchant once, then map back onto every row
+    return merchants.map(dict(zip(unique, cleaned)))
+
+# How an export records spending: 'auto' decides from the amounts themselves
+SPENDING_SIGNS = {'auto': None, 'positive': 1, 'negative': -1}
+
+def spending_sign(raw, columns):
+    """-1 when most non-zero amounts are negative (spending recorded as debits), otherwise 1.
+
+    Card exports usually record purchases as positive amounts and payments or
+    refunds as negative ones, so a few negative rows must not flip the sign.
+    """
+    amounts = parse_amounts(raw[columns['amount']])
+    return -1 if (amounts < 0).sum() > (amounts > 0).sum() else 1
+
+def parse_amounts(amounts):
+    """Parse an amount column, accepting strings such as '-$1,234.50'"""
+    if pd.api.types.is_numeric_dtype(amounts):
+        return amounts
+    return pd.to_numeric(
+        amounts.astype('string').str.replace(r'[$,\s]', '', regex=True),
+        errors='coerce'
+    )
+
+def normalize_chunk(raw, columns, sign=1, categorizer=None):
+    """Convert one chunk of a bank export to the date/amount/merchant/category schema"""
+    # Spending is stored as positive amounts; credits are dropped below
+    amounts = parse_amounts(raw[columns['amount']]) * sign
+
+    chunk = pd.DataFrame({
+        'date': pd.to_datetime(raw[columns['date']], errors='coerce', format='mixed')
+        .dt.normalize().astype('datetime64[ns]'),
+        'amount': amounts.round(2).astype('float64'),
+        'merchant': normalize_merchants(raw[columns['merchant']].astype('string'))
+    })
+    chunk = chunk[chunk['date'].notna() & (chunk['amount'] > 0) & chunk['merchant'].notna()]
+
+    merchants = chunk['merchant'].astype(str)
+    if 'category' in columns:
+        categories = raw.loc[chunk.index, columns['category']].map(normalize_category)
+    else:
+        categories = pd.Series(None, index=chunk.index, dtype=object)
+    unknown = categories.isna()
+    if unknown.any():
+        categorizer = categorizer or default_categorizer()
+        categories[unknown] = categorizer.categorize_series(merchants[unknown])
+
+    chunk['merchant'] = merchants.astype('category')
+    chunk['category'] = categories.fillna(OTHER_CATEGORY).astype('category')
+    return chunk.sort_values('date', ascending=False, kind='stable', ignore_index=True)
+
+def read_transactions(path, chunksize=DEFAULT_CHUNK_SIZE, categorizer=None, sign=None):
+    """Yield normalized chunks of transactions from a CSV or Parquet bank export.
+
+    sign is 1 when spending is recorded as positive amounts and -1 when it
+    is recorded as negative ones; None infers it from the first chunk.
+    """
+    if os.path.splitext(path)[1].lower() in ('.parquet', '.pq'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet files requires pyarrow: pip install pyarrow")
+
+        parquet = pq.ParquetFile(path)
+        columns = resolve_columns(parquet.schema_arrow.names)
+        raw_chunks = (
+            batch.to_pandas()
+            for batch in parquet.iter_batches(batch_size=chunksize, columns=list(columns.values()))
+        )
+    else:
+        columns = resolve_columns(pd.read_csv(path, nrows=0).columns)
+        dtypes = {column: 'string' for column in columns.values()}
+        raw_chunks = pd.read_csv(path, usecols=list(columns.values()), dtype=dtypes, chunksize=chunksize)
+
+    # Unless given, the first chunk decides whether spending is recorded as negative amounts
+    for raw in raw_chunks:
+        if sign is None:
+            sign = spending_sign(raw, columns)
+        yield normalize_chunk(raw, columns, sign, categorizer)
+
+def load_transactions(path, chunksize=DEFAULT_CHUNK_SIZE, categorizer=None, sign=None):
+    """Read a whole bank export into one transactions frame"""
+    chunks = list(read_transactions(path, chunksize, categorizer, sign))
+    if not chunks:
+        return empty_transactions()
+    df = pd.concat(chunks, ignore_index=True)
+    df['merchant'] = df['merchant'].astype('category')
+    df['category'] = df['category'].astype('category')
+    return df.sort_values('date', ascending=False, kind='stable', ignore_index=True)
+
+def import_rollups(path, rollups=None, chunksize=DEFAULT_CHUNK_SIZE, categorizer=None, sign=None):
+    """Fold a bank export into a RollupIndex one chunk at a time, without keeping the rows"""
+    rollups = rollups or RollupIndex()
+    for chunk in read_transactions(path, chunksize, categorizer, sign):
+        rollups.update(chunk)
+    return rollups
+
+def import_into_store(store, path, chunksize=DEFAULT_CHUNK_SIZE, categorizer=None, sign=None):
+    """Append a bank export to a transaction store chunk by chunk; returns rows imported"""
+    imported = 0
+    for chunk in read_transactions(path, chunksize, categorizer, sign):
+        store.append(chunk)
+        imported += len(chunk)
+    return imported
+
+def main():
+    parser = argparse.ArgumentParser(description="Import exported bank transactions")
+    parser.add_argument('path', help="CSV or Parquet file to import")
+    parser.add_argument('--db', help="SQLite database to append to; omit to only summarize the file")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--rules', help="JSON file of extra merchant categorization rules, taking precedence over default rules of the same kind")
+    parser.add_argument('--spending', choices=list(SPENDING_SIGNS), default='auto',
+                        help="Sign of spending amounts in the export (default: whichever most amounts have)")
+    args = parser.parse_args()
+    sign = SPENDING_SIGNS[args.spending]
+
+    categorizer = Categorizer(load_rules(args.rules) + default_rules()) if args.rules else default_categorizer()
+
+    if args.db:
+        from store import create_store
+        store = create_store('sqlite', loader=empty_transactions, path=args.db)
+        imported = import_into_store(store, args.path, args.chunksize, categorizer, sign)
+        rollups = store.rollups()
+        print(f"Imported {imported} transactions into {args.db}")
+    else:
+        rollups = import_rollups(args.path, chunksize=args.chunksize, categorizer=categorizer, sign=sign)
+
+    print(f"Transactions: {rollups.transaction_count}")
+    print(f"Total spent: ${rollups.total_spent:,.2f}")
+    print(f"Top category: {rollups.favorite_category}")
+    for month, total in rollups.month_totals.items():
+        print(f"  {month}: ${total:,.2f}")
+
+    report = categorizer.report()
+    if report['rows']:
+        print(f"Categorized {report['rows']} transactions without a usable category: "
+              f"{report['match_rate']:.1%} matched a rule, memo hit rate {report['memo_hit_rate']:.1%}")
+        for kind, count in report['by_rule'].items():
+            print(f"  {kind}: {count}")
+
+if __name__ == '__main__':
+    main()
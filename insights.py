@@ -0,0 +1,151 @@
+# insights.py
+import calendar
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Days of history behind each category's rolling baseline
+BASELINE_DAYS = 30
+# A category-day needs this much baseline history before it can be flagged
+MIN_HISTORY_DAYS = 14
+# Z-score above which a category's daily spending counts as unusual
+DAY_Z_THRESHOLD = 3.0
+# Robust (MAD-based) z-score above which a transaction counts as unusual
+TRANSACTION_Z_THRESHOLD = 3.5
+# Scales a median absolute deviation to a standard deviation for normal data
+MAD_SCALE = 1.4826
+# Anomalies kept per kind, largest scores first
+MAX_ANOMALIES = 20
+
+class SpendingInsights:
+    """Rolling baselines, anomalies and a month-end projection for one set of transactions"""
+
+    def __init__(self, anomalous_days, anomalous_transactions, category_trends, projection):
+        self.anomalous_days = anomalous_days
+        self.anomalous_transactions = anomalous_transactions
+        self.category_trends = category_trends
+        self.projection = projection
+
+    def to_dict(self):
+        """JSON-friendly form for the API"""
+        return {
+            'anomalous_days': self.anomalous_days.to_dict('records'),
+            'anomalous_transactions': self.anomalous_transactions.to_dict('records'),
+            'category_trends': {category: round(float(change), 1) for category, change in self.category_trends.items()},
+            'projection': self.projection
+        }
+
+def category_codes(df):
+    """Integer category codes and their names, from a categorical column or by factorizing"""
+    if isinstance(df['category'].dtype, pd.CategoricalDtype):
+        return df['category'].cat.codes.to_numpy(), df['category'].cat.categories.astype(str)
+    codes, names = pd.factorize(df['category'], sort=True)
+    return codes, pd.Index(names).astype(str)
+
+def rolling_baselines(matrix, window=BASELINE_DAYS):
+    """Mean and standard deviation of each column over the `window` rows before each row"""
+    padded = np.vstack([np.zeros((1, matrix.shape[1])), matrix])
+    sums = np.cumsum(padded, axis=0)
+    squares = np.cumsum(padded ** 2, axis=0)
+    rows = np.arange(matrix.shape[0])
+    start = np.maximum(rows - window, 0)
+    history = (rows - start)[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (sums[rows] - sums[start]) / history
+        variance = (squares[rows] - squares[start]) / history - mean ** 2
+    return np.nan_to_num(mean), np.sqrt(np.clip(np.nan_to_num(variance), 0, None)), history[:, 0]
+
+def anomalous_days(matrix, first_day, names, window=BASELINE_DAYS):
+    """Category-days whose spending sits far above that category's rolling baseline"""
+    mean, std, history = rolling_baselines(matrix, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scores = np.where(std > 0, (matrix - mean) / std, 0.0)
+    scores[history < MIN_HISTORY_DAYS] = 0.0
+    days, columns = np.nonzero(scores > DAY_Z_THRESHOLD)
+    order = np.argsort(-scores[days, columns], kind='stable')[:MAX_ANOMALIES]
+    days, columns = days[order], columns[order]
+    return pd.DataFrame({
+        'date': (first_day + days).astype('datetime64[D]').astype(str),
+        'category': np.asarray(names)[columns],
+        'amount': np.round(matrix[days, columns], 2),
+        'baseline': np.round(mean[days, columns], 2),
+        'zscore': np.round(scores[days, columns], 1)
+    })
+
+def anomalous_transactions(df, codes, amounts):
+    """Transactions far above their category's typical amount, by robust z-score"""
+    by_category = pd.Series(amounts).groupby(codes)
+    medians = by_category.median().reindex(range(codes.max() + 1)).to_numpy()
+    deviations = np.abs(amounts - medians[codes])
+    mads = pd.Series(deviations).groupby(codes).median().reindex(range(codes.max() + 1)).to_numpy() * MAD_SCALE
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scores = np.where(mads[codes] > 0, (amounts - medians[codes]) / mads[codes], 0.0)
+
+    flagged = np.flatnonzero(scores > TRANSACTION_Z_THRESHOLD)
+    flagged = flagged[np.argsort(-scores[flagged], kind='stable')[:MAX_ANOMALIES]]
+    result = df.iloc[flagged][['date', 'merchant', 'category', 'amount']].astype({'merchant': str, 'category': str})
+    result['date'] = result['date'].dt.strftime('%Y-%m-%d')
+    result['typical_amount'] = np.round(medians[codes[flagged]], 2)
+    result['zscore'] = np.round(scores[flagged], 1)
+    return result.reset_index(drop=True)
+
+def month_end_projection(daily_totals, first_day, today):
+    """Project this month's total from its spending so far and the daily run rate"""
+    today_offset = (np.datetime64(today, 'D') - first_day).astype(np.int64)
+    month_start = np.datetime64(today, 'M').astype('datetime64[D]')
+    start_offset = max((month_start - first_day).astype(np.int64), 0)
+    month_to_date = float(daily_totals[start_offset:today_offset + 1].sum()) if today_offset >= 0 else 0.0
+
+    days_elapsed = today.day
+    days_in_month = calendar.monthrange(today.year, today.month)[1]
+    run_rate = month_to_date / days_elapsed
+    return {
+        'month_to_date': round(month_to_date, 2),
+        'days_elapsed': days_elapsed,
+        'days_in_month': days_in_month,
+        'daily_run_rate': round(run_rate, 2),
+        'projected_total': round(run_rate * days_in_month, 2)
+    }
+
+def compute_insights(df, today=None, window=BASELINE_DAYS):
+    """Vectorized trend and anomaly analysis in time linear in the number of transactions"""
+    if today is None:
+        today = datetime.now().date()
+    if df.empty:
+        return SpendingInsights(
+            pd.DataFrame(columns=['date', 'category', 'amount', 'baseline', 'zscore']),
+            pd.DataFrame(columns=['date', 'merchant', 'category', 'amount', 'typical_amount', 'zscore']),
+            pd.Series(dtype=float),
+            month_end_projection(np.zeros(0), np.datetime64(today, 'D'), today)
+        )
+
+    amounts = df['amount'].to_numpy(dtype=np.float64)
+    days = df['date'].to_numpy().astype('datetime64[D]')
+    codes, names = category_codes(df)
+
+    # Dense days x categories matrix, running through today so quiet recent days count as zero
+    first_day = days.min()
+    last_day = max(days.max(), np.datetime64(today, 'D'))
+    n_days = int((last_day - first_day).astype(np.int64)) + 1
+    day_offsets = (days - first_day).astype(np.int64)
+    matrix = np.bincount(
+        day_offsets * len(names) + codes,
+        weights=amounts,
+        minlength=n_days * len(names)
+    ).reshape(n_days, len(names))
+
+    # Last `window` days against the average of the same span over the whole prior history
+    recent = matrix[-window:].sum(axis=0)
+    prior = matrix[:-window]
+    typical = prior.sum(axis=0) / (len(prior) / window) if len(prior) else np.zeros(len(names))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        change = np.where(typical > 0, (recent - typical) / typical * 100, np.nan)
+    category_trends = pd.Series(change, index=names).dropna().sort_values(ascending=False, kind='stable')
+
+    return SpendingInsights(
+        anomalous_days=anomalous_days(matrix, first_day, names, window),
+        anomalous_transactions=anomalous_transactions(df, codes, amounts),
+        category_trends=category_trends,
+        projection=month_end_projection(matrix.sum(axis=1), first_day, today)
+    )
@@ -0,0 +1,156 @@
+# live.py
+import json
+import queue
+import threading
+from datetime import date
+
+import numpy as np
+from werkzeug.http import http_date
+
+# Seconds between keepalive comments on an idle stream
+KEEPALIVE_SECONDS = 15
+# Messages a slow client may fall behind by before it is sent a full snapshot instead
+QUEUE_SIZE = 8
+# Open streams allowed at once; each one holds a server thread for as long as it is open
+MAX_SUBSCRIBERS = 100
+# Queued in place of deltas for a client that fell too far behind
+RESYNC = object()
+
+def json_default(value):
+    """Encode dates like Flask's jsonify does, and NumPy scalars as plain numbers"""
+    if isinstance(value, date):
+        return http_date(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def transaction_key(transaction):
+    return tuple(sorted(transaction.items()))
+
+def dashboard_delta(previous, payload):
+    """The parts of a dashboard payload that differ from the previous one; everything when there is none"""
+    previous = previous or {'stats': {}, 'ai_summary': None, 'recent_transactions': [], 'chart_specs': {}}
+    delta = {}
+
+    stats = {name: value for name, value in payload['stats'].items() if previous['stats'].get(name) != value}
+    if stats:
+        delta['stats'] = stats
+    if payload['ai_summary'] != previous['ai_summary']:
+        delta['ai_summary'] = payload['ai_summary']
+
+    # New transactions at the top of the list are sent on their own; any other change resends the list
+    seen = {transaction_key(transaction) for transaction in previous['recent_transactions']}
+    recent = payload['recent_transactions']
+    new = [transaction for transaction in recent if transaction_key(transaction) not in seen]
+    if new and (len(new) == len(recent) or recent[:len(new)] != new):
+        delta['recent_transactions'] = recent
+    elif new:
+        delta['new_transactions'] = new
+
+    charts = {
+        chart_id: spec for chart_id, spec in payload['chart_specs'].items()
+        if previous['chart_specs'].get(chart_id) != spec
+    }
+    if charts:
+        delta['charts'] = {chart_id: json.loads(spec) for chart_id, spec in charts.items()}
+    return delta
+
+def encode_event(event, event_id, data):
+    """One server-sent event"""
+    body = json.dumps(data, default=json_default, separators=(',', ':'))
+    return f"event: {event}\nid: {event_id}\ndata: {body}\n\n"
+
+class LiveUpdates:
+    """Push dashboard changes to every connected event stream, computing each delta once.
+
+    publish() is called with each newly built dashboard payload. It diffs it
+    against the previous payload, encodes the result as a server-sent event
+    and hands the same message to every subscriber's queue, so the cost of a
+    change does not grow with the number of open dashboards.
+    """
+
+    def __init__(self, queue_size=QUEUE_SIZE, keepalive=KEEPALIVE_SECONDS, max_subscribers=MAX_SUBSCRIBERS):
+        self.queue_size = queue_size
+        self.keepalive = keepalive
+        self.max_subscribers = max_subscribers
+        self.deltas = 0
+        self._payload = None
+        self._snapshot = None
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    @property
+    def subscribers(self):
+        return len(self._subscribers)
+
+    def publish(self, version, payload):
+        """Send what changed in a new dashboard payload to every subscriber"""
+        with self._lock:
+            previous = self._payload
+            if previous is not None and previous['fingerprint'] == payload['fingerprint']:
+                return
+            message = encode_event('update', payload['fingerprint'], dashboard_delta(previous, payload))
+            self._payload, self._snapshot = payload, None
+            self.deltas += 1
+
+            for subscriber in self._subscribers:
+                try:
+                    subscriber.put_nowait(message)
+                except queue.Full:
+                    # Too far behind for deltas to apply: replace its backlog with a snapshot
+                    self._drain(subscriber)
+                    subscriber.put_nowait(RESYNC)
+
+    def subscribe(self, since=None):
+        """Register a client; it gets a snapshot first unless it already shows the data as of `since`.
+
+        Returns None when max_subscribers streams are already open.
+        """
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            self._subscribers.add(subscriber)
+            if self._payload is not None and since != self._payload['fingerprint']:
+                subscriber.put_nowait(RESYNC)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def stream(self, subscriber):
+        """Server-sent event text for one subscribed client, until it disconnects"""
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    message = subscriber.get(timeout=self.keepalive)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if message is RESYNC:
+                    message = self.snapshot(subscriber)
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+    def snapshot(self, subscriber=None):
+        """The whole current payload as one event, encoded once per change.
+
+        Deltas already queued for the subscriber are dropped, since the
+        snapshot includes them.
+        """
+        with self._lock:
+            if subscriber is not None:
+                self._drain(subscriber)
+            if self._snapshot is None:
+                self._snapshot = encode_event('snapshot', self._payload['fingerprint'], dashboard_delta(None, self._payload))
+            return self._snapshot
+
+    def _drain(self, subscriber):
+        try:
+            while True:
+                subscriber.get_nowait()
+        except queue.Empty:
+            pass
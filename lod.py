@@ -0,0 +1,86 @@
+# lod.py
+import numpy as np
+import pandas as pd
+
+GRANULARITIES = ('day', 'week', 'month')
+GRANULARITY_ADJECTIVES = {'day': 'Daily', 'week': 'Weekly', 'month': 'Monthly'}
+# Use the finest granularity that gives at most this many buckets for the range
+TARGET_BUCKETS = 180
+# Series longer than this are downsampled with LTTB
+MAX_POINTS = 500
+
+def choose_granularity(start, end, target=TARGET_BUCKETS):
+    """Finest of day, week or month that covers [start, end] in at most `target` buckets"""
+    days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    if days <= target:
+        return 'day'
+    if days / 7 <= target:
+        return 'week'
+    return 'month'
+
+def bucket_starts(days, granularity):
+    """First day of the bucket each datetime64[D] value falls into"""
+    if granularity == 'day':
+        return days
+    if granularity == 'week':
+        # Weeks start on Monday; 1970-01-01 was a Thursday
+        return days - (days.astype(np.int64) + 3) % 7
+    if granularity == 'month':
+        return days.astype('datetime64[M]').astype('datetime64[D]')
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+def resample(daily_totals, start, end, granularity):
+    """Sum daily totals into buckets covering [start, end], including empty ones"""
+    first = np.datetime64(pd.Timestamp(start), 'D')
+    last = np.datetime64(pd.Timestamp(end), 'D')
+    all_days = np.arange(first, last + np.timedelta64(1, 'D'))
+    days = daily_totals.index.to_numpy().astype('datetime64[D]')
+    inside = (days >= first) & (days <= last)
+    amounts = np.bincount(
+        (days[inside] - first).astype(np.int64),
+        weights=daily_totals.to_numpy(dtype=float)[inside],
+        minlength=len(all_days)
+    )
+
+    starts = bucket_starts(all_days, granularity)
+    labels, bucket_ids = np.unique(starts, return_inverse=True)
+    return labels, np.bincount(bucket_ids, weights=amounts, minlength=len(labels))
+
+def lttb(x, y, threshold):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets downsampling"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        # The triangle's third corner is the average of the next bucket
+        next_hi = min(int((i + 2) * every) + 1, n)
+        avg_x = x[hi:next_hi].mean() if next_hi > hi else x[n - 1]
+        avg_y = y[hi:next_hi].mean() if next_hi > hi else y[n - 1]
+        areas = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+def trend_series(daily_totals, start=None, end=None, granularity=None, max_points=MAX_POINTS):
+    """Spending over [start, end] at a granularity suited to the range, at most max_points long.
+
+    Returns (granularity, dates, amounts). Without start or end the range is
+    that of daily_totals; without a granularity one is picked from the range.
+    """
+    if daily_totals.empty and (start is None or end is None):
+        return granularity or 'day', np.array([], dtype='datetime64[D]'), np.array([])
+    start = pd.Timestamp(start) if start is not None else daily_totals.index.min()
+    end = pd.Timestamp(end) if end is not None else daily_totals.index.max()
+    if granularity is None:
+        granularity = choose_granularity(start, end)
+
+    dates, amounts = resample(daily_totals, start, end, granularity)
+    keep = lttb(dates.astype(np.int64).astype(float), amounts, max_points)
+    return granularity, dates[keep], amounts[keep]
@@ -0,0 +1,175 @@
+# metrics.py
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from flask import g, request
+
+# Latency histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Cumulative Prometheus-style histogram"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Record one observation"""
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+class Metrics:
+    """Request latencies, per-stage timings and row counts, rendered in Prometheus text format"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.requests = defaultdict(lambda: Histogram(self.buckets))
+        self.stages = defaultdict(lambda: Histogram(self.buckets))
+        self.responses = Counter()
+        self.gauges = {}
+        self._lock = threading.Lock()
+
+    def observe_request(self, route, status, seconds):
+        """Record the latency and status of one request"""
+        with self._lock:
+            self.requests[route].observe(seconds)
+            self.responses[(route, status)] += 1
+
+    def observe_stage(self, route, stage, seconds):
+        """Record the time one stage of a route took"""
+        with self._lock:
+            self.stages[(route, stage)].observe(seconds)
+
+    def set_gauge(self, name, value):
+        """Set a gauge such as the number of stored transactions"""
+        with self._lock:
+            self.gauges[name] = value
+
+    def render(self):
+        """Prometheus text exposition of every metric"""
+        lines = []
+        with self._lock:
+            lines += self._histogram_lines(
+                'spending_request_duration_seconds', 'Request latency by route',
+                {(('route', route),): histogram for route, histogram in self.requests.items()}
+            )
+            lines += self._histogram_lines(
+                'spending_stage_duration_seconds', 'Time spent in each stage of a route',
+                {(('route', route), ('stage', stage)): histogram
+                 for (route, stage), histogram in self.stages.items()}
+            )
+            lines.append('# HELP spending_responses_total Responses by route and status')
+            lines.append('# TYPE spending_responses_total counter')
+            for (route, status), count in sorted(self.responses.items()):
+                lines.append(f'spending_responses_total{{route="{route}",status="{status}"}} {count}')
+            for name, value in sorted(self.gauges.items()):
+                lines.append(f'# TYPE {name} gauge')
+                lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def _histogram_lines(self, name, help_text, histograms):
+        lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for labels, histogram in sorted(histograms.items()):
+            label_text = ','.join(f'{key}="{value}"' for key, value in labels)
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{label_text},le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{{label_text}}} {histogram.sum:.6f}')
+            lines.append(f'{name}_count{{{label_text}}} {histogram.count}')
+        return lines
+
+class SamplingProfiler:
+    """Sample one thread's call stack at a fixed interval and count collapsed stacks"""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """Start sampling in a background thread"""
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the sampler thread"""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def write(self, path):
+        """Write samples in collapsed-stack format, as read by flamegraph tools"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+@contextmanager
+def stage(name):
+    """Time one stage of the current request for Server-Timing and /metrics"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        g.setdefault('stage_timings', []).append((name, time.perf_counter() - start))
+
+def init_app(app, metrics):
+    """Record request and stage timings for every request and add Server-Timing headers.
+
+    Setting app.config['PROFILING'] lets a request opt into the sampling
+    profiler with ?profile=1; its collapsed stacks are written to
+    app.config['PROFILE_DIR'] and the file name is returned in X-Profile.
+    """
+
+    @app.before_request
+    def start_timing():
+        g.request_start = time.perf_counter()
+        g.stage_timings = []
+        if app.config.get('PROFILING') and request.args.get('profile') == '1':
+            g.profiler = SamplingProfiler(threading.get_ident())
+            g.profiler.start()
+
+    @app.after_request
+    def record_timing(response):
+        elapsed = time.perf_counter() - g.get('request_start', time.perf_counter())
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+
+        timings = g.get('stage_timings', [])
+        for name, seconds in timings:
+            metrics.observe_stage(route, name, seconds)
+        metrics.observe_request(route, response.status_code, elapsed)
+
+        entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings]
+        entries.append(f"total;dur={elapsed * 1000:.2f}")
+        response.headers['Server-Timing'] = ', '.join(entries)
+
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.stop()
+            profile_dir = app.config.get('PROFILE_DIR') or tempfile.gettempdir()
+            os.makedirs(profile_dir, exist_ok=True)
+            path = os.path.join(profile_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S')}-{id(profiler):x}.txt")
+            profiler.write(path)
+            response.headers['X-Profile'] = os.path.basename(path)
+        return response
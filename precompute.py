@@ -0,0 +1,77 @@
+# precompute.py
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class DashboardPrecomputer:
+    """Rebuild the dashboard payload in the background after each data change.
+
+    build() returns (version, payload) and current_version() reports the
+    version of the data right now. Bursts of schedule() calls within
+    `delay` seconds coalesce into one rebuild, and only one build runs at a
+    time: requests that need a payload while a build is in flight wait for
+    it instead of starting their own. Listeners added with subscribe() are
+    called with (version, payload) after every build.
+    """
+
+    def __init__(self, build, current_version, delay=0.1):
+        self.build = build
+        self.current_version = current_version
+        self.delay = delay
+        self.builds = 0
+        # (version, payload) of the last build, replaced as one object so readers never mix two builds
+        self._built = (None, None)
+        self._pending = threading.Event()
+        self._build_lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._listeners = []
+
+    def schedule(self):
+        """Ask for a rebuild soon; safe to call on every data change"""
+        self._pending.set()
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='dashboard-precompute', daemon=True)
+                self._thread.start()
+
+    def subscribe(self, listener):
+        """Call listener(version, payload) after every build"""
+        self._listeners.append(listener)
+
+    def get(self, version):
+        """Payload for the given data version, building it now if the background run hasn't"""
+        built_version, payload = self._built
+        if built_version == version:
+            return payload
+        return self._rebuild(version)
+
+    def _rebuild(self, version=None):
+        with self._build_lock:
+            # Another thread may have finished this version while we waited
+            built_version, payload = self._built
+            if version is not None and built_version == version:
+                return payload
+            built_version, payload = self.build()
+            self._built = (built_version, payload)
+            self.builds += 1
+            for listener in self._listeners:
+                listener(built_version, payload)
+            return payload
+
+    def _run(self):
+        while True:
+            self._pending.wait()
+            # Keep waiting while changes keep arriving, so a burst costs one rebuild
+            while True:
+                self._pending.clear()
+                time.sleep(self.delay)
+                if not self._pending.is_set():
+                    break
+            try:
+                self._rebuild(self.current_version())
+            except Exception:
+                # Requests will rebuild on demand and surface the error themselves
+                logger.exception("Dashboard precomputation failed")
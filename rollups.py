@@ -0,0 +1,131 @@
+# rollups.py
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+
+class RollupIndex:
+    """Running sums, counts and maxima keyed by month and category"""
+
+    def __init__(self):
+        self.total_spent = 0.0
+        self.transaction_count = 0
+        self.largest_transaction = 0.0
+        self.category_counter = Counter()
+        self._sums = defaultdict(float)
+        self._counts = defaultdict(int)
+        self._maxima = {}
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build an index over an existing set of transactions"""
+        index = cls()
+        index.update(df)
+        return index
+
+    @classmethod
+    def from_groups(cls, months, categories, sums, counts, maxima):
+        """Rebuild an index from the per-(month, category) arrays returned by groups()"""
+        index = cls()
+        for month, category, total, count, largest in zip(months, categories, sums, counts, maxima):
+            key = (str(month), str(category))
+            index._sums[key] = float(total)
+            index._counts[key] = int(count)
+            index._maxima[key] = float(largest)
+            index.category_counter[key[1]] += int(count)
+        index.total_spent = float(np.sum(sums))
+        index.transaction_count = int(np.sum(counts))
+        index.largest_transaction = float(np.max(maxima)) if len(maxima) else 0.0
+        return index
+
+    def copy(self):
+        """Independent copy, costing O(months x categories) rather than O(transactions)"""
+        index = RollupIndex()
+        index.total_spent = self.total_spent
+        index.transaction_count = self.transaction_count
+        index.largest_transaction = self.largest_transaction
+        index.category_counter = Counter(self.category_counter)
+        index._sums = defaultdict(float, self._sums)
+        index._counts = defaultdict(int, self._counts)
+        index._maxima = dict(self._maxima)
+        return index
+
+    def groups(self):
+        """(months, categories, sums, counts, maxima) arrays with one entry per (month, category)"""
+        keys = list(self._sums)
+        return (
+            np.array([month for month, _ in keys], dtype=str),
+            np.array([category for _, category in keys], dtype=str),
+            np.array([self._sums[key] for key in keys], dtype=np.float64),
+            np.array([self._counts[key] for key in keys], dtype=np.int64),
+            np.array([self._maxima[key] for key in keys], dtype=np.float64)
+        )
+
+    def update(self, batch):
+        """Fold a batch of new transactions into the running totals"""
+        if batch.empty:
+            return self
+
+        months = batch['date'].to_numpy().astype('datetime64[M]').astype(str)
+        categories = batch['category'].astype(str).to_numpy()
+        grouped = batch['amount'].groupby([months, categories]).agg(['sum', 'count', 'max'])
+
+        # One dict update per (month, category) group, not per transaction
+        for key, total, count, largest in zip(
+            grouped.index, grouped['sum'], grouped['count'], grouped['max']
+        ):
+            self._sums[key] += float(total)
+            self._counts[key] += int(count)
+            self._maxima[key] = max(self._maxima.get(key, largest), float(largest))
+            self.category_counter[key[1]] += int(count)
+
+        amounts = batch['amount'].to_numpy(dtype=np.float64)
+        self.total_spent += float(amounts.sum())
+        self.transaction_count += len(amounts)
+        self.largest_transaction = max(self.largest_transaction, float(amounts.max()))
+        return self
+
+    @property
+    def month_totals(self):
+        """Total spending per month"""
+        return self._rollup(self._sums, 0, sum, 'float64')
+
+    @property
+    def month_counts(self):
+        """Transaction count per month"""
+        return self._rollup(self._counts, 0, sum, 'int64')
+
+    @property
+    def month_maxima(self):
+        """Largest single transaction per month"""
+        return self._rollup(self._maxima, 0, max, 'float64')
+
+    @property
+    def category_totals(self):
+        """Total spending per category, largest first"""
+        return self._rollup(self._sums, 1, sum, 'float64').sort_values(ascending=False, kind='stable')
+
+    @property
+    def category_counts(self):
+        """Transaction count per category"""
+        return pd.Series(self.category_counter, dtype='int64').sort_index()
+
+    @property
+    def favorite_category(self):
+        """Most frequent category, ties broken alphabetically"""
+        if not self.category_counter:
+            return 'N/A'
+        most = max(self.category_counter.values())
+        return min(name for name, count in self.category_counter.items() if count == most)
+
+    def month_category_total(self, month, category):
+        """Spending for one category in one month"""
+        return self._sums.get((month, category), 0.0)
+
+    def _rollup(self, values, level, combine, dtype):
+        groups = defaultdict(list)
+        for key, value in values.items():
+            groups[key[level]].append(value)
+        return pd.Series(
+            {name: combine(items) for name, items in groups.items()}, dtype=dtype
+        ).sort_index()
@@ -0,0 +1,330 @@
+# snapshot.py
+"""Save transactions and their precomputed aggregates as a columnar snapshot.
+
+    python snapshot.py --output snapshot --rows 10000000
+    python snapshot.py --output snapshot --source statement.csv
+    python snapshot.py --output snapshot --info
+
+A snapshot is a directory holding a base directory of .npy arrays plus a
+manifest.json: the transaction columns (dictionary-encoded merchants and
+categories), the dashboard aggregates, the rollup index, the date index
+and the aggregate cube. A CURRENT file names the published base plus any
+segments holding transactions appended since, and is replaced
+atomically, so readers never see a half-written snapshot.
+Loading memory-maps every array, so starting up costs a few file opens
+whatever the number of rows, and every worker that opens the same
+snapshot shares its pages through the OS page cache.
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from aggregates import SpendingAggregates, compute_aggregates
+from columnar import concat_transactions, encode
+from cube import DIMENSIONS, AggregateCube
+from date_index import DateIndex
+from http_cache import dataset_fingerprint
+from rollups import RollupIndex
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Bumped whenever the layout changes; snapshots in another format are ignored
+SNAPSHOT_FORMAT = 1
+MANIFEST = 'manifest.json'
+# File naming the published directories; replaced atomically on every publish
+CURRENT = 'CURRENT'
+LOCK = '.lock'
+# Suffix of directories and files still being written
+STAGING = '.tmp'
+# Appended segments are folded into a new base once they hold this share of its rows, or number this many
+COMPACT_RATIO = 0.25
+MAX_SEGMENTS = 32
+
+AGGREGATE_SCALARS = ('total_spent', 'transaction_count', 'largest_transaction')
+AGGREGATE_SERIES = ('category_totals', 'category_counts', 'month_totals', 'month_counts', 'month_active_days',
+                    'weekday_totals', 'weekday_counts', 'daily_totals')
+ROLLUP_GROUPS = ('months', 'categories', 'sums', 'counts', 'maxima')
+
+# An opened snapshot; pointer is the CURRENT contents it was read from
+Snapshot = namedtuple('Snapshot', 'transactions rollups derived pointer')
+
+def index_array(index):
+    """An index as a plain array that np.save can write without pickling"""
+    if isinstance(index, pd.DatetimeIndex):
+        return index.to_numpy(dtype='datetime64[ns]')
+    return index.to_numpy().astype(str)
+
+def frame_arrays(df):
+    """Transaction columns: datetime64 dates, float amounts and dictionary-encoded strings"""
+    arrays = {
+        'date': df['date'].to_numpy(dtype='datetime64[ns]'),
+        'amount': df['amount'].to_numpy(dtype=np.float64)
+    }
+    for column in ('merchant', 'category'):
+        codes, dictionary = encode(df[column])
+        arrays[column] = codes
+        arrays[f"{column}.dictionary"] = dictionary.astype(str)
+    return arrays
+
+def frame_from_arrays(arrays):
+    """Rebuild the transactions frame on top of the arrays without copying them"""
+    columns = {'date': arrays['date'], 'amount': arrays['amount']}
+    for column in ('merchant', 'category'):
+        columns[column] = pd.Categorical.from_codes(
+            arrays[column], categories=arrays[f"{column}.dictionary"], validate=False
+        )
+    return pd.DataFrame(columns, copy=False)
+
+def aggregate_arrays(aggregates):
+    arrays = {}
+    for name in AGGREGATE_SERIES:
+        series = getattr(aggregates, name)
+        arrays[name] = series.to_numpy()
+        arrays[f"{name}.index"] = index_array(series.index)
+    table = aggregates.month_category_totals
+    arrays['month_category_totals'] = table.to_numpy()
+    arrays['month_category_totals.index'] = index_array(table.index)
+    arrays['month_category_totals.columns'] = index_array(table.columns)
+    return arrays
+
+def aggregates_from_arrays(arrays, scalars):
+    series = {
+        name: pd.Series(arrays[name], index=pd.Index(arrays[f"{name}.index"]))
+        for name in AGGREGATE_SERIES
+    }
+    month_category_totals = pd.DataFrame(
+        arrays['month_category_totals'],
+        index=pd.Index(arrays['month_category_totals.index']),
+        columns=pd.Index(arrays['month_category_totals.columns'])
+    )
+    return SpendingAggregates(month_category_totals=month_category_totals, **scalars, **series)
+
+def cube_arrays(cube):
+    arrays = {'cents': cube.cents, 'counts': cube.counts}
+    for dimension in DIMENSIONS:
+        arrays[dimension] = cube.codes[dimension]
+        arrays[f"{dimension}.dictionary"] = cube.dictionaries[dimension].astype(str)
+    return arrays
+
+def cube_from_arrays(arrays):
+    return AggregateCube(
+        {dimension: arrays[dimension] for dimension in DIMENSIONS},
+        {dimension: arrays[f"{dimension}.dictionary"] for dimension in DIMENSIONS},
+        arrays['cents'],
+        arrays['counts']
+    )
+
+def snapshot_lock(path, shared=False):
+    """Hold the snapshot's lock file: shared while reading, exclusive while publishing or seeding.
+
+    A no-op where fcntl is unavailable (Windows), where only one process
+    should write a snapshot at a time.
+    """
+    os.makedirs(path, exist_ok=True)
+    lock = open(os.path.join(path, LOCK), 'a')
+    if fcntl is not None:
+        fcntl.flock(lock, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+    return lock
+
+def read_pointer(path):
+    """The CURRENT pointer naming the published base, or None when there is no snapshot in this format"""
+    try:
+        with open(os.path.join(path, CURRENT), encoding='utf-8') as f:
+            pointer = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return pointer if pointer.get('format') == SNAPSHOT_FORMAT else None
+
+def new_directory(path, kind):
+    """Create a uniquely named directory to build a snapshot part in; it stays invisible until published"""
+    name = f"{kind}-{time.time_ns()}-{os.getpid()}"
+    os.makedirs(os.path.join(path, name + STAGING))
+    return name
+
+def publish(path, pointer, new=()):
+    """Make staged directories visible and point CURRENT at them, under the exclusive lock.
+
+    CURRENT is replaced in one os.replace, so readers always see either the
+    old snapshot or the new one. Directories it no longer references are
+    deleted; processes that still have their files mapped keep reading them
+    until they reload.
+    """
+    for name in new:
+        os.rename(os.path.join(path, name + STAGING), os.path.join(path, name))
+    partial_path = os.path.join(path, CURRENT + STAGING)
+    with open(partial_path, 'w', encoding='utf-8') as f:
+        json.dump(pointer, f, indent=2)
+    os.replace(partial_path, os.path.join(path, CURRENT))
+
+    referenced = {pointer['base'], *pointer.get('segments', ())}
+    for entry in os.scandir(path):
+        if entry.is_dir() and not entry.name.endswith(STAGING) and entry.name not in referenced:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+def write_base(df, path):
+    """Write transactions and everything precomputed from them to a new, unpublished directory"""
+    aggregates = compute_aggregates(df)
+    index = DateIndex.from_frame(df)
+    parts = {
+        'transactions': frame_arrays(df),
+        'aggregates': aggregate_arrays(aggregates),
+        'rollups': dict(zip(ROLLUP_GROUPS, RollupIndex.from_frame(df).groups())),
+        'date_index': {'dates': index.dates, 'positions': index.positions, 'cumulative': index.cumulative},
+        'cube': cube_arrays(AggregateCube.from_frame(df))
+    }
+
+    name = new_directory(path, 'base')
+    directory = os.path.join(path, name + STAGING)
+    for part, arrays in parts.items():
+        for array_name, array in arrays.items():
+            np.save(os.path.join(directory, f"{part}.{array_name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+
+    manifest = {
+        'format': SNAPSHOT_FORMAT,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'rows': len(df),
+        'fingerprint': dataset_fingerprint(df),
+        'aggregates': {scalar: getattr(aggregates, scalar) for scalar in AGGREGATE_SCALARS},
+        'arrays': {part: list(arrays) for part, arrays in parts.items()}
+    }
+    with open(os.path.join(directory, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return name, manifest
+
+def write_snapshot(df, path, lock=True):
+    """Replace the snapshot at path with these transactions; pass lock=False when already holding it"""
+    name, manifest = write_base(df, path)
+    with snapshot_lock(path) if lock else contextlib.nullcontext():
+        publish(path, {'format': SNAPSHOT_FORMAT, 'base': name, 'rows': len(df), 'segments': [], 'segment_rows': 0},
+                new=[name])
+    return manifest
+
+def needs_compaction(pointer, rows):
+    """Whether an append of this many rows should rewrite the base instead of adding a segment"""
+    return (pointer['segment_rows'] + rows > COMPACT_RATIO * pointer['rows']
+            or len(pointer['segments']) >= MAX_SEGMENTS)
+
+def append_segment(batch, path, pointer):
+    """Publish appended transactions as one more segment of the snapshot CURRENT names; returns the new pointer.
+
+    Only the batch is written, so an append costs O(batch) however large
+    the base is. The caller holds the exclusive lock and passes the pointer
+    it read under it.
+    """
+    name = new_directory(path, 'segment')
+    directory = os.path.join(path, name + STAGING)
+    arrays = frame_arrays(batch)
+    for array_name, array in arrays.items():
+        np.save(os.path.join(directory, f"transactions.{array_name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+    with open(os.path.join(directory, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump({'format': SNAPSHOT_FORMAT, 'rows': len(batch), 'arrays': {'transactions': list(arrays)}}, f, indent=2)
+
+    pointer = dict(pointer, segments=pointer['segments'] + [name], segment_rows=pointer['segment_rows'] + len(batch))
+    publish(path, pointer, new=[name])
+    return pointer
+
+def read_manifest(path):
+    """The published base's manifest, or None when there is no snapshot"""
+    pointer = read_pointer(path)
+    if pointer is None:
+        return None
+    with open(os.path.join(path, pointer['base'], MANIFEST), encoding='utf-8') as f:
+        return json.load(f)
+
+def read_part(directory, mmap=True):
+    """A base or segment directory as (manifest, {part: {name: array}})"""
+    with open(os.path.join(directory, MANIFEST), encoding='utf-8') as f:
+        manifest = json.load(f)
+    # Plain ndarray views, so the memmap subclass does not spread to everything computed from them
+    arrays = {
+        part: {
+            name: np.load(
+                os.path.join(directory, f"{part}.{name}.npy"), mmap_mode='r' if mmap else None, allow_pickle=False
+            ).view(np.ndarray)
+            for name in names
+        }
+        for part, names in manifest['arrays'].items()
+    }
+    frame = frame_from_arrays(arrays['transactions'])
+    if len(frame) != manifest['rows']:
+        raise ValueError(f"Snapshot part {directory} has {len(frame)} rows but its manifest lists {manifest['rows']}")
+    return manifest, arrays, frame
+
+def load_snapshot(path, mmap=True, lock=True):
+    """Open a snapshot, or return None when there is none.
+
+    With no segments, the transactions are built on the memory-mapped base
+    arrays without copying, and derived maps TransactionStore.derived()
+    names to the structures saved with them. Segments are combined with
+    the base in memory and folded into its rollups; derived is then empty,
+    since the saved structures cover the base only. The files are opened
+    under the shared lock, so a concurrent publish cannot delete them
+    halfway; pass lock=False when already holding it.
+    """
+    with snapshot_lock(path, shared=True) if lock else contextlib.nullcontext():
+        pointer = read_pointer(path)
+        if pointer is None:
+            return None
+        manifest, arrays, df = read_part(os.path.join(path, pointer['base']), mmap)
+        segments = [read_part(os.path.join(path, name), mmap)[2] for name in pointer['segments']]
+
+    groups = arrays['rollups']
+    rollups = RollupIndex.from_groups(*(groups[name] for name in ROLLUP_GROUPS))
+    if segments:
+        for segment in segments:
+            rollups.update(segment)
+        # Newest segment first, matching the order appends leave rows in
+        return Snapshot(concat_transactions(segments[::-1] + [df]), rollups, {}, pointer)
+
+    date_index = arrays['date_index']
+    derived = {
+        'fingerprint': manifest['fingerprint'],
+        'aggregates': aggregates_from_arrays(arrays['aggregates'], manifest['aggregates']),
+        'date_index': DateIndex(date_index['dates'], date_index['positions'], date_index['cumulative']),
+        'cube': cube_from_arrays(arrays['cube'])
+    }
+    return Snapshot(df, rollups, derived, pointer)
+
+def main():
+    parser = argparse.ArgumentParser(description="Write or inspect a columnar transactions snapshot")
+    parser.add_argument('--output', default='snapshot', help="Snapshot directory")
+    parser.add_argument('--source', help="Bank export (CSV or Parquet) to snapshot instead of sample data")
+    parser.add_argument('--rows', type=int, default=150, help="Sample transactions to generate when no source is given")
+    parser.add_argument('--info', action='store_true', help="Time loading an existing snapshot and print its manifest")
+    args = parser.parse_args()
+
+    if args.info:
+        start = time.perf_counter()
+        snapshot = load_snapshot(args.output)
+        elapsed = time.perf_counter() - start
+        if snapshot is None:
+            parser.error(f"No snapshot in {args.output}")
+        manifest = read_manifest(args.output)
+        print(f"Loaded {len(snapshot.transactions):,} rows ({len(snapshot.pointer['segments'])} appended segments) "
+              f"in {elapsed * 1000:.1f}ms")
+        print(json.dumps({name: manifest[name] for name in ('created_at', 'rows', 'fingerprint', 'aggregates')}, indent=2))
+        return
+
+    if args.source:
+        from importer import load_transactions
+        df = load_transactions(args.source)
+    else:
+        from data import generate_transactions
+        df = generate_transactions(args.rows)
+    start = time.perf_counter()
+    manifest = write_snapshot(df, args.output)
+    print(f"Wrote {manifest['rows']:,} rows to {args.output} in {time.perf_counter() - start:.2f}s")
+
+if __name__ == '__main__':
+    main()
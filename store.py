@@ -0,0 +1,376 @@
+# store.py
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from columnar import TransactionTable, concat_transactions
+from rollups import RollupIndex
+from snapshot import append_segment, load_snapshot, needs_compaction, read_pointer, snapshot_lock, write_snapshot
+
+# Versions are unique across every store in the process, so caches keyed by
+# version never confuse two stores
+_versions = itertools.count(1)
+_missing = object()
+
+# Seconds between checks of a shared snapshot for changes made by other processes
+SNAPSHOT_POLL_SECONDS = 1.0
+
+class TransactionStore:
+    """Load transactions once per process and share them between requests"""
+
+    # Persistent backends hold the data of record: refresh() re-reads them
+    # instead of replacing their contents with a fresh load
+    persistent = False
+
+    def __init__(self, loader, compact=False):
+        self.loader = loader
+        # Compact stores keep only a TransactionTable resident and decode a
+        # DataFrame when one is needed, trading CPU for memory per row
+        self.compact = compact
+        self.version = 0
+        self.updated_at = None
+        self._df = None
+        self._table = None
+        # Weak reference to the frame decoded from _table, shared while anyone still holds it
+        self._decoded = None
+        self._rollups = None
+        self._budgets = None
+        self._derived = {}
+        self._listeners = []
+        self._lock = threading.RLock()
+
+    def get(self):
+        """Return the shared transactions, loading them on first use"""
+        df = self._df
+        if df is not None:
+            return df
+
+        with self._lock:
+            if self._df is None and self._table is None:
+                df = self._read()
+                if df is None:
+                    # Nothing persisted yet, so seed the backend from the loader
+                    df = self._seed()
+                self._set(df, *self._read_precomputed())
+            if self._table is not None:
+                df = self._decoded() if self._decoded is not None else None
+                if df is None:
+                    df = self._table.to_frame()
+                    self._decoded = weakref.ref(df)
+                return df
+            return self._df
+
+    def recent(self, count=15):
+        """Most recent transactions as records"""
+        with self._lock:
+            df = self.get()
+            if self._table is not None:
+                return self._table.records(0, count)
+            return df.head(count).to_dict('records')
+
+    def subscribe(self, listener):
+        """Call listener() after every change to the stored transactions"""
+        self._listeners.append(listener)
+
+    def snapshot(self):
+        """Return (version, transactions) read together under the store lock"""
+        with self._lock:
+            df = self.get()
+            return self.version, df
+
+    def refresh(self):
+        """Re-read a persistent backend, or replace in-memory transactions with a fresh load"""
+        with self._lock:
+            if self.persistent:
+                self.invalidate()
+                return self.get()
+            df = self.loader()
+            self._write(df)
+            self._set(df)
+            return df
+
+    def append(self, batch):
+        """Add new transactions and fold them into the rollup index"""
+        with self._lock:
+            rollups = self.rollups()
+            combined = concat_transactions([batch, self.get()])
+
+            # Persist before listeners see the new data
+            self._append(batch, combined)
+            # Update the rollups before listeners run, so they never rebuild them from scratch.
+            # Readers may be iterating the published index outside the lock, so fold the
+            # batch into a copy and publish that with the new transactions
+            self._set(combined, rollups.copy().update(batch))
+            return combined
+
+    def rollups(self):
+        """Running month and category totals for the stored transactions"""
+        with self._lock:
+            if self._rollups is None:
+                self._rollups = RollupIndex.from_frame(self.get())
+            return self._rollups
+
+    def budgets(self):
+        """Monthly spending limits by category"""
+        with self._lock:
+            if self._budgets is None:
+                self._budgets = self._read_budgets()
+            return dict(self._budgets)
+
+    def set_budget(self, category, limit):
+        """Set a category's monthly spending limit, or remove it when limit is None"""
+        with self._lock:
+            budgets = self.budgets()
+            if limit is None:
+                budgets.pop(category, None)
+            else:
+                budgets[category] = float(limit)
+            self._write_budgets(budgets)
+            self._budgets = budgets
+            return dict(budgets)
+
+    def check_for_updates(self):
+        """Pick up changes other processes made to the backend; called before each request"""
+        pass
+
+    def invalidate(self):
+        """Drop the in-process copy so the next get() reads the backend again"""
+        with self._lock:
+            self._df = None
+            self._table = None
+            self._decoded = None
+            self._rollups = None
+            if self.persistent:
+                # The memory backend's budgets exist only here, so there is nothing to re-read
+                self._budgets = None
+            self._derived = {}
+
+    def derived(self, name, builder):
+        """Cache builder(df) until the transactions change"""
+        with self._lock:
+            # Cache hits must not call get(), which decodes a compact store's whole table
+            value = self._derived.get((name, self.version), _missing)
+            if value is not _missing:
+                return value
+            df = self.get()
+            version = self.version
+
+        # Built outside the lock, so a slow builder never holds up other requests
+        value = builder(df)
+        with self._lock:
+            if self.version == version:
+                value = self._derived.setdefault((name, version), value)
+        return value
+
+    def _set(self, df, rollups=None, derived=None):
+        if self.compact:
+            self._table = TransactionTable.from_frame(df)
+            self._decoded = None
+        else:
+            self._df = df
+        self._rollups = rollups
+        self.version = next(_versions)
+        self._derived = {(name, self.version): value for name, value in (derived or {}).items()}
+        self.updated_at = datetime.now(timezone.utc)
+        for listener in self._listeners:
+            listener()
+
+    def _read(self):
+        """Return persisted transactions, or None when there are none"""
+        return None
+
+    def _write(self, df):
+        """Persist transactions to the backend"""
+        pass
+
+    def _append(self, batch, combined):
+        """Persist newly appended transactions to the backend; combined is every transaction after the append"""
+        pass
+
+    def _read_precomputed(self):
+        """Return (rollups, {derived name: value}) persisted with the transactions just read"""
+        return None, None
+
+    def _seed(self):
+        """Fill an empty backend from the loader and return what it now holds"""
+        df = self.loader()
+        self._write(df)
+        return df
+
+    def _read_budgets(self):
+        """Return persisted budgets as {category: monthly limit}"""
+        return {}
+
+    def _write_budgets(self, budgets):
+        """Persist budgets to the backend"""
+        pass
+
+class MemoryTransactionStore(TransactionStore):
+    """Keep transactions only in process memory"""
+
+class SQLiteTransactionStore(TransactionStore):
+    """Persist transactions to a SQLite database file"""
+
+    persistent = True
+    table = 'transactions'
+    budgets_table = 'budgets'
+
+    def __init__(self, loader, path='transactions.db', compact=False):
+        super().__init__(loader, compact)
+        self.path = path
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def _read(self):
+        with self._connect() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (self.table,)
+            ).fetchone()
+            if not exists:
+                return None
+            df = pd.read_sql_query(
+                f"SELECT date, amount, merchant, category FROM {self.table} ORDER BY date DESC, rowid",
+                conn,
+                parse_dates=['date']
+            )
+
+        if df.empty:
+            return None
+        # Same resolution as loaded and imported frames, so every worker fingerprints identical data identically
+        df['date'] = df['date'].astype('datetime64[ns]')
+        df['merchant'] = df['merchant'].astype('category')
+        df['category'] = df['category'].astype('category')
+        return df
+
+    def _write(self, df):
+        with self._connect() as conn:
+            self._rows(df).to_sql(self.table, conn, if_exists='replace', index=False)
+
+    def _append(self, batch, combined):
+        with self._connect() as conn:
+            self._rows(batch).to_sql(self.table, conn, if_exists='append', index=False)
+
+    def _read_budgets(self):
+        with self._connect() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.budgets_table} (category TEXT PRIMARY KEY, monthly_limit REAL NOT NULL)"
+            )
+            rows = conn.execute(f"SELECT category, monthly_limit FROM {self.budgets_table}").fetchall()
+        return dict(rows)
+
+    def _write_budgets(self, budgets):
+        with self._connect() as conn:
+            conn.execute(f"DELETE FROM {self.budgets_table}")
+            conn.executemany(f"INSERT INTO {self.budgets_table} VALUES (?, ?)", budgets.items())
+
+    def _rows(self, df):
+        rows = df[['date', 'amount', 'merchant', 'category']].copy()
+        rows['date'] = rows['date'].dt.strftime('%Y-%m-%d')
+        rows['merchant'] = rows['merchant'].astype(str)
+        rows['category'] = rows['category'].astype(str)
+        return rows
+
+class SnapshotTransactionStore(TransactionStore):
+    """Persist transactions to a columnar snapshot directory that is memory-mapped on load.
+
+    Aggregates, rollups, the date index and the aggregate cube are saved with
+    the transactions, so a warm start does no work proportional to the number
+    of rows. Appends are written as segments holding only the new rows and
+    folded into a new base once they reach a quarter of its size. Other
+    processes sharing the snapshot notice its CURRENT pointer change within
+    poll_interval seconds and reload.
+    """
+
+    persistent = True
+
+    def __init__(self, loader, path='snapshot', compact=False, poll_interval=SNAPSHOT_POLL_SECONDS):
+        super().__init__(loader, compact)
+        self.path = path
+        self.budgets_path = os.path.join(path, 'budgets.json')
+        self.poll_interval = poll_interval
+        # CURRENT contents matching the transactions held in memory; None forces a reload
+        self._pointer = None
+        self._polled = 0.0
+        self._precomputed = (None, None)
+
+    def check_for_updates(self):
+        now = time.monotonic()
+        if now - self._polled < self.poll_interval:
+            return
+        self._polled = now
+        with self._lock:
+            if (self._df is not None or self._table is not None) and read_pointer(self.path) != self._pointer:
+                self.invalidate()
+                self.get()
+
+    def _read(self, lock=True):
+        snapshot = load_snapshot(self.path, lock=lock)
+        if snapshot is None:
+            return None
+        self._pointer = snapshot.pointer
+        self._precomputed = (snapshot.rollups, snapshot.derived)
+        return snapshot.transactions
+
+    def _seed(self):
+        # Workers starting together seed one snapshot: the first takes the
+        # lock and writes it, the others wait and then read what it wrote
+        with snapshot_lock(self.path):
+            df = self._read(lock=False)
+            if df is None:
+                df = self.loader()
+                write_snapshot(df, self.path, lock=False)
+                self._pointer = read_pointer(self.path)
+            return df
+
+    def _read_precomputed(self):
+        precomputed, self._precomputed = self._precomputed, (None, None)
+        return precomputed
+
+    def _write(self, df):
+        with snapshot_lock(self.path):
+            write_snapshot(df, self.path, lock=False)
+            self._pointer = read_pointer(self.path)
+
+    def _append(self, batch, combined):
+        with snapshot_lock(self.path):
+            pointer = read_pointer(self.path)
+            # Another process changed the snapshot since it was loaded: add only
+            # this batch, and reload everything at the next check for updates
+            up_to_date = pointer is not None and pointer == self._pointer
+            if pointer is None or (up_to_date and needs_compaction(pointer, len(batch))):
+                write_snapshot(combined, self.path, lock=False)
+                pointer, up_to_date = read_pointer(self.path), True
+            else:
+                pointer = append_segment(batch, self.path, pointer)
+            self._pointer = pointer if up_to_date else None
+
+    def _read_budgets(self):
+        if not os.path.exists(self.budgets_path):
+            return {}
+        with open(self.budgets_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_budgets(self, budgets):
+        os.makedirs(self.path, exist_ok=True)
+        partial_path = self.budgets_path + '.part'
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            json.dump(budgets, f, indent=2)
+        os.replace(partial_path, self.budgets_path)
+
+def create_store(backend, loader, path=None, compact=False):
+    """Create a transaction store for the named backend ('memory', 'sqlite' or 'snapshot')"""
+    if backend == 'memory':
+        return MemoryTransactionStore(loader, compact)
+    if backend == 'sqlite':
+        return SQLiteTransactionStore(loader, path or 'transactions.db', compact)
+    if backend == 'snapshot':
+        return SnapshotTransactionStore(loader, path or 'snapshot', compact)
+    raise ValueError(f"Unknown transaction store backend: {backend}")
@@ -0,0 +1,109 @@
+# test_categorizer.py
+import pandas as pd
+import pytest
+
+from categorizer import AhoCorasick, Categorizer, PrefixTrie, Rule
+
+RULES = [
+    Rule('exact', 'Shell Gas Station', 'Transportation'),
+    Rule('prefix', 'shell', 'Shopping'),
+    Rule('prefix', 'shell gas', 'Bills & Utilities'),
+    Rule('contains', 'gas', 'Healthcare'),
+    Rule('contains', 'gas station', 'Entertainment'),
+    Rule('regex', r'\bstation\b', 'Travel'),
+]
+
+def test_exact_beats_prefix():
+    assert Categorizer(RULES).match('  SHELL   gas station ') == ('Transportation', 'exact')
+
+def test_longest_prefix_beats_contains():
+    assert Categorizer(RULES).match('Shell Gas Co') == ('Bills & Utilities', 'prefix')
+    assert Categorizer(RULES).match('Shell Oil') == ('Shopping', 'prefix')
+
+def test_longest_contains_beats_regex():
+    assert Categorizer(RULES).match('Corner Gas Station') == ('Entertainment', 'contains')
+    assert Categorizer(RULES).match('Corner Gas') == ('Healthcare', 'contains')
+
+def test_regex_when_nothing_else_matches():
+    assert Categorizer(RULES).match('Union Station Parking') == ('Travel', 'regex')
+
+def test_unmatched_falls_back_to_default():
+    assert Categorizer(RULES, default='Other').match('Nowhere') == ('Other', 'unmatched')
+
+def test_first_regex_rule_wins_not_earliest_match_in_string():
+    rules = [
+        Rule('regex', r'\binn\b', 'Travel'),
+        Rule('regex', r'\bbakery\b', 'Food & Dining'),
+    ]
+    assert Categorizer(rules).match('Bakery At The Inn') == ('Travel', 'regex')
+
+def test_default_rules_keep_regex_order():
+    assert Categorizer().match('Bakery At The Inn') == ('Travel', 'regex')
+
+def test_earlier_rules_win_within_a_kind():
+    rules = [
+        Rule('exact', 'acme', 'Travel'),
+        Rule('exact', 'acme', 'Shopping'),
+        Rule('prefix', 'acme co', 'Travel'),
+        Rule('prefix', 'acme co', 'Shopping'),
+        Rule('contains', 'widget', 'Travel'),
+        Rule('contains', 'widget', 'Shopping'),
+    ]
+    categorizer = Categorizer(rules)
+    assert categorizer.match('Acme') == ('Travel', 'exact')
+    assert categorizer.match('Acme Co 123') == ('Travel', 'prefix')
+    assert categorizer.match('The Widget Shop') == ('Travel', 'contains')
+
+def test_prefix_trie_longest_prefix():
+    trie = PrefixTrie([('uber', 'Transportation'), ('uber eats', 'Food & Dining')])
+    assert trie.longest_prefix('uber eats 123') == 'Food & Dining'
+    assert trie.longest_prefix('uber trip') == 'Transportation'
+    assert trie.longest_prefix('lyft') is None
+
+def test_aho_corasick_finds_overlapping_patterns():
+    automaton = AhoCorasick([('he', 'A'), ('she', 'B'), ('hers', 'C'), ('his', 'D')])
+    assert automaton.best_match('she hers') == 'C'
+    assert automaton.best_match('his she') == 'B'
+    assert automaton.best_match('xyz') is None
+
+def test_aho_corasick_matches_whole_words():
+    automaton = AhoCorasick([('spa', 'Personal Care'), ('spanish tapas', 'Food & Dining'), ('rent', 'Bills')])
+    assert automaton.best_match('ushers') is None
+    assert automaton.best_match('spanish tapas bar') == 'Food & Dining'
+    assert automaton.best_match('the spanish spa') == 'Personal Care'
+    assert automaton.best_match('current account') is None
+    assert automaton.best_match('rent-a-car') == 'Bills'
+
+def test_prefix_trie_matches_whole_words():
+    trie = PrefixTrie([('shell', 'Transportation'), ('target', 'Shopping')])
+    assert trie.longest_prefix('shell') == 'Transportation'
+    assert trie.longest_prefix('shell #123') == 'Transportation'
+    assert trie.longest_prefix('shellfish shack') is None
+    assert trie.longest_prefix('targeted ads llc') is None
+
+@pytest.mark.parametrize('merchant', [
+    'Spanish Tapas Bar', 'Parent Teacher Assoc', 'Current Account Fee', 'Gymboree', 'Shellfish Shack', 'Targeted Ads LLC',
+])
+def test_default_rules_do_not_match_inside_words(merchant):
+    assert Categorizer().match(merchant) == ('Other', 'unmatched')
+
+@pytest.mark.parametrize('merchant, category', [
+    ('Day Spa', 'Personal Care'),
+    ('Monthly Rent', 'Bills & Utilities'),
+    ('Gold Gym', 'Healthcare'),
+    ("McDonald's", 'Food & Dining'),
+    ('McDonalds', 'Food & Dining'),
+    ('Exxonmobil 4455', 'Transportation'),
+    ('Netflix.com', 'Entertainment'),
+])
+def test_default_rules_match_whole_words(merchant, category):
+    assert Categorizer().match(merchant)[0] == category
+
+def test_categorize_series_counts_rows_and_memoizes():
+    categorizer = Categorizer(RULES, default='Other')
+    merchants = pd.Series(['Shell Oil', 'Shell Oil', 'Nowhere', 'Corner Gas'])
+    categories = categorizer.categorize_series(merchants)
+    assert list(categories) == ['Shopping', 'Shopping', 'Other', 'Healthcare']
+    report = categorizer.report()
+    assert report['by_rule'] == {'exact': 0, 'prefix': 2, 'contains': 1, 'regex': 0, 'unmatched': 1}
+    assert report['distinct_merchants'] == 3
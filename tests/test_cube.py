@@ -0,0 +1,64 @@
+# test_cube.py
+import pandas as pd
+import pytest
+
+from cube import AggregateCube
+
+@pytest.fixture
+def transactions():
+    return pd.DataFrame({
+        'date': pd.to_datetime(['2024-05-04', '2024-05-04', '2024-05-06', '2024-06-01', '2024-06-03']),
+        'amount': [10.10, 20.20, 5.00, 100.00, 7.25],
+        'merchant': ['Cafe', 'Cafe', 'Shop', 'Hotel', 'Cafe'],
+        'category': ['Food & Dining', 'Food & Dining', 'Shopping', 'Travel', 'Food & Dining'],
+    })
+
+def test_cells_are_distinct_combinations(transactions):
+    cube = AggregateCube.from_frame(transactions)
+    # The two Saturday Cafe rows in May share a cell
+    assert len(cube) == 4
+    assert cube.counts.sum() == len(transactions)
+
+def test_grand_total(transactions):
+    result = AggregateCube.from_frame(transactions).query(group_by=())
+    assert result.to_dict('records') == [{'total': 142.55, 'count': 5, 'average': 28.51}]
+
+def test_group_by_matches_pandas(transactions):
+    result = AggregateCube.from_frame(transactions).query(group_by=('category', 'month'))
+    expected = (
+        transactions.assign(month=transactions['date'].dt.strftime('%Y-%m'))
+        .groupby(['category', 'month'])['amount'].agg(['sum', 'count']).round(2)
+    )
+    got = result.set_index(['category', 'month'])
+    for key, row in expected.iterrows():
+        assert got.loc[key, 'total'] == row['sum']
+        assert got.loc[key, 'count'] == row['count']
+    assert list(result['total']) == sorted(result['total'], reverse=True)
+
+def test_filters(transactions):
+    cube = AggregateCube.from_frame(transactions)
+    result = cube.query(group_by=('merchant',), filters={'weekday': ['Saturday'], 'category': ['Food & Dining', 'Travel']})
+    assert result.to_dict('records') == [
+        {'merchant': 'Hotel', 'total': 100.0, 'count': 1, 'average': 100.0},
+        {'merchant': 'Cafe', 'total': 30.3, 'count': 2, 'average': 15.15},
+    ]
+
+def test_unknown_values_match_nothing(transactions):
+    result = AggregateCube.from_frame(transactions).query(group_by=(), filters={'merchant': ['Nowhere']})
+    assert result.to_dict('records') == [{'total': 0.0, 'count': 0, 'average': 0.0}]
+
+def test_unknown_dimension_raises(transactions):
+    with pytest.raises(ValueError):
+        AggregateCube.from_frame(transactions).query(group_by=('city',))
+
+def test_limit(transactions):
+    result = AggregateCube.from_frame(transactions).query(group_by=('merchant',), limit=2)
+    assert list(result['merchant']) == ['Hotel', 'Cafe']
+
+def test_empty_frame():
+    empty = pd.DataFrame({
+        'date': pd.to_datetime([]), 'amount': [], 'merchant': pd.Series([], dtype=str), 'category': pd.Series([], dtype=str)
+    })
+    cube = AggregateCube.from_frame(empty)
+    assert len(cube) == 0
+    assert cube.query(group_by=()).to_dict('records') == [{'total': 0.0, 'count': 0, 'average': 0.0}]
@@ -0,0 +1,25 @@
+# test_data.py
+import pytest
+
+import data
+
+@pytest.fixture(scope='module')
+def client():
+    return data.create_app(config={'PRECOMPUTE_DELAY': 60}).test_client()
+
+def test_statement_for_a_month_without_transactions():
+    df = data.generate_transactions(50, seed=0)
+    summary, monthly_df = data.generate_monthly_statement(df, month='1999-02')
+    assert monthly_df.empty
+    assert summary['transactions_this_month'] == 0
+    assert summary['current_month_spending'] == 0
+    assert summary['statement_period'] == '1999-02-01 to 1999-02-28'
+
+@pytest.mark.parametrize('windows', ['0', '-5', '7,0', 'x'])
+def test_rolling_rejects_bad_windows(client, windows):
+    assert client.get(f'/api/rolling?windows={windows}').status_code == 400
+
+def test_rolling_windows(client):
+    response = client.get('/api/rolling?windows=7,30')
+    assert response.status_code == 200
+    assert set(response.get_json()['windows']) == {'7d', '30d'}
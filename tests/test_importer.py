@@ -0,0 +1,42 @@
+# test_importer.py
+import pandas as pd
+import pytest
+
+from importer import load_transactions, normalize_merchants
+
+@pytest.mark.parametrize('raw, cleaned', [
+    ('SQ *BLUE BOTTLE COFFEE', 'Blue Bottle Coffee'),
+    ('TST* JOES DINER', 'Joes Diner'),
+    ('PAYPAL *NETFLIX', 'Netflix'),
+    ('AMZN MKTP US*2K4AB12C3', 'Amzn Mktp Us'),
+    ('STARBUCKS STORE #12345', 'Starbucks Store'),
+    ('WALMART #1234 DALLAS TX', 'Walmart'),
+    ('UBER *TRIP', 'Uber Trip'),
+    ('Sqirl  Cafe', 'Sqirl Cafe'),
+])
+def test_normalize_merchants(raw, cleaned):
+    assert normalize_merchants(pd.Series([raw], dtype='string'))[0] == cleaned
+
+def test_processor_prefixed_merchants_are_categorized(tmp_path):
+    path = tmp_path / 'statement.csv'
+    path.write_text(
+        "Date,Description,Amount\n"
+        "2024-05-01,SQ *BLUE BOTTLE COFFEE,4.50\n"
+        "2024-05-02,TST* JOES DINER,82.10\n"
+        "2024-05-03,PAYPAL *NETFLIX,25.99\n"
+    )
+    df = load_transactions(str(path)).sort_values('date', ignore_index=True)
+    assert list(df['merchant'].astype(str)) == ['Blue Bottle Coffee', 'Joes Diner', 'Netflix']
+    assert list(df['category'].astype(str)) == ['Food & Dining', 'Food & Dining', 'Entertainment']
+
+def test_payments_do_not_flip_card_exports(tmp_path):
+    path = tmp_path / 'card.csv'
+    path.write_text(
+        "Date,Description,Amount\n"
+        "2024-05-01,COFFEE SHOP,4.50\n"
+        "2024-05-02,GROCERY STORE,82.10\n"
+        "2024-05-03,BOOK STORE,25.99\n"
+        "2024-05-04,AUTOPAY PAYMENT,-500.00\n"
+    )
+    df = load_transactions(str(path))
+    assert sorted(df['amount']) == [4.50, 25.99, 82.10]
@@ -0,0 +1,49 @@
+# test_lod.py
+import numpy as np
+import pandas as pd
+
+from lod import choose_granularity, lttb, resample, trend_series
+
+def test_lttb_keeps_short_series():
+    x = np.arange(10, dtype=float)
+    assert list(lttb(x, x, 20)) == list(range(10))
+
+def test_lttb_keeps_endpoints_and_threshold():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50)
+    keep = lttb(x, y, 100)
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 999
+    assert np.all(np.diff(keep) > 0)
+
+def test_lttb_keeps_spikes():
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[[137, 512, 871]] = [50, -40, 90]
+    keep = lttb(x, y, 50)
+    assert {137, 512, 871} <= set(keep.tolist())
+
+def test_choose_granularity():
+    assert choose_granularity('2024-01-01', '2024-06-28') == 'day'
+    assert choose_granularity('2024-01-01', '2025-01-01') == 'week'
+    assert choose_granularity('2020-01-01', '2025-01-01') == 'month'
+
+def test_resample_includes_empty_buckets():
+    daily = pd.Series([10.0, 5.0], index=pd.to_datetime(['2024-01-01', '2024-03-15']))
+    labels, amounts = resample(daily, '2024-01-01', '2024-03-31', 'month')
+    assert [str(label) for label in labels] == ['2024-01-01', '2024-02-01', '2024-03-01']
+    assert list(amounts) == [10.0, 0.0, 5.0]
+
+def test_weeks_start_on_monday():
+    daily = pd.Series([1.0, 2.0], index=pd.to_datetime(['2024-01-07', '2024-01-08']))  # Sunday, Monday
+    labels, amounts = resample(daily, '2024-01-07', '2024-01-08', 'week')
+    assert [str(label) for label in labels] == ['2024-01-01', '2024-01-08']
+    assert list(amounts) == [1.0, 2.0]
+
+def test_trend_series_downsamples_and_preserves_range():
+    days = pd.date_range('2020-01-01', periods=2000, freq='D')
+    daily = pd.Series(np.random.default_rng(0).random(2000), index=days)
+    granularity, dates, amounts = trend_series(daily, granularity='day', max_points=300)
+    assert granularity == 'day'
+    assert len(dates) == len(amounts) == 300
+    assert dates[0] == np.datetime64('2020-01-01') and dates[-1] == np.datetime64(days[-1].date())
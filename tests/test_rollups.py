@@ -0,0 +1,31 @@
+# test_rollups.py
+import pandas as pd
+
+from rollups import RollupIndex
+from store import MemoryTransactionStore
+
+def frame(dates, amounts, categories):
+    return pd.DataFrame({
+        'date': pd.to_datetime(dates),
+        'amount': amounts,
+        'merchant': ['Shop'] * len(dates),
+        'category': categories,
+    })
+
+def test_copy_is_independent():
+    index = RollupIndex.from_frame(frame(['2024-05-01', '2024-05-02'], [10.0, 5.0], ['Travel', 'Shopping']))
+    copy = index.copy().update(frame(['2024-05-03'], [7.0], ['Travel']))
+    assert index.transaction_count == 2
+    assert index.month_category_total('2024-05', 'Travel') == 10.0
+    assert copy.transaction_count == 3
+    assert copy.month_category_total('2024-05', 'Travel') == 17.0
+    assert copy.category_counter['Travel'] == 2 and index.category_counter['Travel'] == 1
+
+def test_append_publishes_new_rollups():
+    store = MemoryTransactionStore(lambda: frame(['2024-05-01'], [10.0], ['Travel']))
+    before = store.rollups()
+    store.append(frame(['2024-06-01'], [4.0], ['Travel']))
+    after = store.rollups()
+    assert after is not before
+    assert before.transaction_count == 1 and list(before.month_totals.index) == ['2024-05']
+    assert after.transaction_count == 2 and list(after.month_totals.index) == ['2024-05', '2024-06']
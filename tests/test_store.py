@@ -0,0 +1,60 @@
+# test_store.py
+import threading
+
+import pandas as pd
+
+from store import MemoryTransactionStore, SQLiteTransactionStore
+
+def transactions():
+    return pd.DataFrame({
+        'date': pd.to_datetime(['2024-05-02', '2024-05-01']),
+        'amount': [12.5, 40.0],
+        'merchant': pd.Series(['Cafe', 'Hotel'], dtype='category'),
+        'category': pd.Series(['Food & Dining', 'Travel'], dtype='category'),
+    })
+
+def test_memory_budgets_survive_invalidate():
+    store = MemoryTransactionStore(transactions)
+    store.set_budget('Travel', 500)
+    store.invalidate()
+    assert store.budgets() == {'Travel': 500.0}
+
+def test_sqlite_invalidate_rereads_budgets(tmp_path):
+    path = str(tmp_path / 'transactions.db')
+    store = SQLiteTransactionStore(transactions, path)
+    other = SQLiteTransactionStore(transactions, path)
+    assert store.budgets() == {}
+    other.set_budget('Travel', 300)
+    store.invalidate()
+    assert store.budgets() == {'Travel': 300.0}
+
+def test_derived_builds_outside_the_lock():
+    store = MemoryTransactionStore(transactions)
+    store.get()
+    started, release = threading.Event(), threading.Event()
+
+    def slow(df):
+        started.set()
+        release.wait(5)
+        return 'slow'
+
+    builder = threading.Thread(target=store.derived, args=('slow', slow))
+    builder.start()
+    started.wait(5)
+    # Another value can be built and read while the slow build is still running
+    assert store.derived('rows', len) == 2
+    assert builder.is_alive()
+    release.set()
+    builder.join()
+    assert store.derived('slow', slow) == 'slow'
+
+def test_derived_value_of_an_old_version_is_not_cached():
+    store = MemoryTransactionStore(transactions)
+    store.get()
+
+    def appending(df):
+        store.append(transactions().head(1))
+        return len(df)
+
+    assert store.derived('rows', appending) == 2
+    assert store.derived('rows', len) == 3